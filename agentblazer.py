@@ -0,0 +1,167 @@
+"""
+Agentblazer badge requirements and verification rules
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+# Agentblazer Requirements Database
+AGENTBLAZER_REQUIREMENTS = {
+    "Champion": {
+        "modules": [
+            "Artificial Intelligence Fundamentals",
+            "Generative AI Basics", 
+            "Natural Language Processing Basics",
+            "Large Language Models",
+            "Data Fundamentals for AI",
+            "Prompt Fundamentals",
+            "Prompt Builder Basics",
+            "Einstein Trust Layer",
+            "Autonomous Agents",
+            "Introduction to Agentforce",
+            "Agentforce for Service"
+        ],
+        "keywords": [
+            "artificial intelligence", "generative ai", "natural language",
+            "large language", "data fundamentals", "prompt fundamentals",
+            "prompt builder", "einstein trust", "autonomous agents", 
+            "agentforce", "service agent"
+        ],
+        "min_points": 2500,
+        "min_keywords": 5
+    },
+    
+    "Innovator": {
+        "modules": [
+            "AI Strategy",
+            "AI+Data: Project Planning", 
+            "Agentforce: Agent Planning",
+            "Trusted Agentic AI",
+            "Agentforce Builder Basics",
+            "Agentforce SDR Setup",
+            "Sales Coach Setup"
+        ],
+        "keywords": [
+            "ai strategy", "project planning", "agent planning",
+            "trusted agentic", "agentforce builder", "agentforce sdr",
+            "sales coach", "superbadge"
+        ],
+        "min_points": 7500,
+        "min_keywords": 4
+    },
+    
+    "Legend": {
+        "modules": [
+            "Agentforce Specialist",
+            "Agent Customization",
+            "Prompt Engineering Techniques",
+            "Agent Customization with Apex",
+            "Data Cloud Experiences",
+            "Retrieval Augmented Generation",
+            "Testing Tools and Strategies"
+        ],
+        "keywords": [
+            "agentforce specialist", "agent customization", "prompt engineering",
+            "apex", "data cloud", "retrieval augmented", "testing tools",
+            "certification", "advanced"
+        ],
+        "min_points": 15000,
+        "min_keywords": 6
+    }
+}
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase, punctuation-free form used to match badge titles to modules"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(title).lower()).split())
+
+
+# Precomputed once: normalized module title -> module name, and per-level sets
+MODULE_INDEX: Dict[str, str] = {
+    normalize_title(module): module
+    for requirements in AGENTBLAZER_REQUIREMENTS.values()
+    for module in requirements["modules"]
+}
+LEVEL_MODULES: Dict[str, FrozenSet[str]] = {
+    level: frozenset(requirements["modules"]) for level, requirements in AGENTBLAZER_REQUIREMENTS.items()
+}
+LEVEL_KEYWORDS: Dict[str, FrozenSet[str]] = {
+    level: frozenset(requirements["keywords"]) for level, requirements in AGENTBLAZER_REQUIREMENTS.items()
+}
+
+
+def match_modules(badge_titles: Iterable[str]) -> List[str]:
+    """Requirement modules among earned badge titles, in the order found"""
+    found = {}
+    for title in badge_titles:
+        module = MODULE_INDEX.get(normalize_title(title))
+        if module:
+            found[module] = True
+    return list(found)
+
+
+def level_decision(points: int, keywords_found: Iterable[str], level: str) -> Optional[bool]:
+    """
+    True once a level is met, False once it can no longer be met, None while
+    more badges could still change the outcome. Points are known up front
+    and loading more badges can only add keywords.
+    """
+    requirements = AGENTBLAZER_REQUIREMENTS[level]
+    if (points or 0) < requirements["min_points"]:
+        return False
+    if len(LEVEL_KEYWORDS[level].intersection(keywords_found)) >= requirements["min_keywords"]:
+        return True
+    return None
+
+
+def levels_decided(points: int, keywords_found: Iterable[str]) -> bool:
+    """Whether every level's outcome is settled (lazy badge loading can stop)"""
+    keywords_found = set(keywords_found)
+    return all(level_decision(points, keywords_found, level) is not None for level in AGENTBLAZER_REQUIREMENTS)
+
+def verify_agentblazer_badge(profile_data: Dict, target_level: str) -> Dict:
+    """Verify if profile meets Agentblazer badge requirements"""
+    
+    if not profile_data.get("success", False):
+        return {
+            "qualified": False,
+            "error": profile_data.get("error", "Unknown error"),
+            "target_level": target_level
+        }
+    
+    requirements = AGENTBLAZER_REQUIREMENTS[target_level]
+    
+    # Check points requirement
+    points_qualified = profile_data["points"] >= requirements["min_points"]
+    
+    # Check keywords requirement
+    matching_keywords = [kw for kw in profile_data["keywords_found"] if kw in LEVEL_KEYWORDS[target_level]]
+    keywords_qualified = len(matching_keywords) >= requirements["min_keywords"]
+    
+    # Earned requirement modules (informational; from real badge titles)
+    matching_modules = [module for module in profile_data.get("modules", []) if module in LEVEL_MODULES[target_level]]
+    
+    # Overall qualification
+    overall_qualified = points_qualified and keywords_qualified
+    
+    return {
+        "qualified": overall_qualified,
+        "target_level": target_level,
+        "points": {
+            "actual": profile_data["points"],
+            "required": requirements["min_points"],
+            "qualified": points_qualified
+        },
+        "keywords": {
+            "found": len(matching_keywords),
+            "required": requirements["min_keywords"],
+            "qualified": keywords_qualified,
+            "matching_keywords": matching_keywords
+        },
+        "modules": {
+            "found": len(matching_modules),
+            "total": len(requirements["modules"]),
+            "matching_modules": matching_modules
+        },
+        "badge_awarded": target_level if overall_qualified else "Not Qualified",
+        "profile_data": profile_data
+    }
@@ -0,0 +1,373 @@
+"""
+Direct JSON extraction from the Trailblazer profile's backend calls.
+
+While a profile renders in the browser, ``ApiCapture`` keeps the XHR/fetch
+responses that come from the profile API and parses points, badges, rank
+and badge titles straight out of the JSON. The requests that produced them
+are remembered in an ``EndpointRegistry`` (persisted under ``./data``), so
+``ApiClient`` can later replay them over a pooled keep-alive HTTP session
+without starting a browser at all.
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from profile_cache import DATA_DIR
+from profile_urls import profile_handle
+
+ENDPOINTS_PATH = os.path.join(DATA_DIR, "api_endpoints.json")
+
+# Backend calls that carry profile data
+API_URL_PATTERNS = [
+    re.compile(r'profile\.api\.trailhead\.com'),
+    re.compile(r'/graphql', re.IGNORECASE),
+    re.compile(r'/services/apexrest/', re.IGNORECASE),
+    re.compile(r'/aura\?', re.IGNORECASE)
+]
+
+# Most specific first: a profile total wins over a generic "points" key
+POINTS_KEYS = ("earnedpointssum", "totalpoints", "earnedpoints", "points")
+BADGES_KEYS = ("earnedbadgescount", "totalbadges", "badgecount", "badgescount")
+BADGE_LIST_KEYS = ("earnedawards", "badges", "awards", "edges")
+TITLE_KEYS = ("title", "name", "label")
+
+# Only these request headers are worth replaying outside the browser
+REPLAY_HEADERS = ("content-type", "accept", "x-requested-with")
+
+SLUG_PLACEHOLDER = "{slug}"
+
+
+def is_profile_api_url(url: str) -> bool:
+    return any(pattern.search(url) for pattern in API_URL_PATTERNS)
+
+
+def _as_int(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str) and re.fullmatch(r'\d{1,3}(?:,\d{3})*|\d+', value.strip()):
+        return int(value.strip().replace(',', ''))
+    return None
+
+
+def parse_profile_json(payloads: List[Any]) -> Dict:
+    """
+    Walk captured JSON payloads for profile stats.
+
+    Returns points/badges/rank (None when not present), the list of earned
+    badge titles and ``text``: every string value joined, lowercased, for
+    keyword matching. Stats are only read outside badge lists (a badge's
+    own ``points`` is not the profile total), and the most specific key in
+    ``POINTS_KEYS``/``BADGES_KEYS`` wins wherever it appears.
+    """
+    parsed = {"points": None, "badges": None, "rank": "", "badge_titles": [], "text": ""}
+    strings: List[str] = []
+    found: Dict[str, tuple] = {}
+
+    def take(field: str, keys: tuple, key: str, value: Any):
+        number = _as_int(value)
+        priority = keys.index(key)
+        if number is not None and (field not in found or priority < found[field][0]):
+            found[field] = (priority, number)
+
+    def walk(node: Any, parent_key: str = "", in_badges: bool = False):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                lowered = key.lower()
+                if not in_badges and lowered in POINTS_KEYS:
+                    take("points", POINTS_KEYS, lowered, value)
+                elif not in_badges and lowered in BADGES_KEYS:
+                    take("badges", BADGES_KEYS, lowered, value)
+                elif not in_badges and lowered == "rank" and not parsed["rank"]:
+                    if isinstance(value, dict):
+                        parsed["rank"] = str(value.get("title") or value.get("name") or "")
+                    elif isinstance(value, str):
+                        parsed["rank"] = value
+                walk(value, lowered, in_badges or lowered in BADGE_LIST_KEYS)
+            if parent_key in BADGE_LIST_KEYS or parent_key == "node":
+                for title_key in TITLE_KEYS:
+                    title = node.get(title_key)
+                    if isinstance(title, str) and title:
+                        parsed["badge_titles"].append(title)
+                        break
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, parent_key, in_badges)
+        elif isinstance(node, str):
+            strings.append(node)
+
+    for payload in payloads:
+        walk(payload)
+
+    for field, (_, number) in found.items():
+        parsed[field] = number
+    parsed["rank"] = parsed["rank"].title()
+    parsed["badge_titles"] = list(dict.fromkeys(parsed["badge_titles"]))
+    parsed["text"] = "\n".join(strings).lower()
+    return parsed
+
+
+def _template_value(value: Any, slug: str) -> Any:
+    """Replace JSON string values equal to the slug with the placeholder"""
+    if isinstance(value, dict):
+        return {key: _template_value(item, slug) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_template_value(item, slug) for item in value]
+    if isinstance(value, str) and value.lower() == slug:
+        return SLUG_PLACEHOLDER
+    return value
+
+
+def template_request(request: Dict, slug: str) -> Optional[Dict]:
+    """
+    Slug-templated copy of a captured request: only URL path segments,
+    query values and JSON body values that equal the slug are replaced.
+    None when nothing was replaced (the request is keyed some other way,
+    e.g. by user id, and would return this profile for every slug) or the
+    slug also appears anywhere else (host, part of a longer value,
+    headers, a non-JSON body), where templating would be unsafe.
+    """
+    parts = urlsplit(request["url"])
+    path = "/".join(SLUG_PLACEHOLDER if segment.lower() == slug else segment for segment in parts.path.split("/"))
+    query = urlencode(
+        [(key, SLUG_PLACEHOLDER if value.lower() == slug else value)
+         for key, value in parse_qsl(parts.query, keep_blank_values=True)],
+        safe="{}"
+    )
+    url = urlunsplit((parts.scheme, parts.netloc, path, query, parts.fragment))
+
+    post_data = request.get("post_data")
+    if post_data:
+        try:
+            post_data = json.dumps(_template_value(json.loads(post_data), slug))
+        except ValueError:
+            pass
+
+    if SLUG_PLACEHOLDER not in url and SLUG_PLACEHOLDER not in (post_data or ""):
+        return None
+    leftovers = [url.replace(SLUG_PLACEHOLDER, ""), (post_data or "").replace(SLUG_PLACEHOLDER, "")]
+    leftovers += [str(value) for value in request.get("headers", {}).values()]
+    if any(slug in text.lower() for text in leftovers):
+        return None
+    return {**request, "url": url, "post_data": post_data}
+
+
+def has_profile_stats(parsed: Dict) -> bool:
+    return parsed.get("points") is not None or parsed.get("badges") is not None
+
+
+class EndpointRegistry:
+    """Remembers which backend requests returned profile data: a slug template, or per profile slug"""
+
+    def __init__(self, path: str = ENDPOINTS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, List[Dict]] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._endpoints = json.load(f)
+        except (OSError, ValueError):
+            self._endpoints = {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # A temp file per writer: queue workers and shards share this file
+        fd, tmp_path = tempfile.mkstemp(prefix=".api_endpoints-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._endpoints, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def record(self, profile_url: str, requests_made: List[Dict]):
+        """
+        Store replayable requests for a profile. When every request can be
+        templated safely (see ``template_request``) only the slug template
+        is kept, so profiles served by the same endpoints add nothing and
+        the file is rewritten only when the endpoint set changes. Best
+        effort: a failed write never fails the scrape that produced it.
+        """
+        slug = profile_handle(profile_url)
+        if not slug or not requests_made:
+            return
+        template = [template_request(request, slug) for request in requests_made]
+        with self._lock:
+            before = dict(self._endpoints)
+            if all(template):
+                self._endpoints[SLUG_PLACEHOLDER] = template
+                self._endpoints.pop(slug, None)
+            else:
+                self._endpoints[slug] = requests_made
+            if self._endpoints == before:
+                return
+            try:
+                self._save()
+            except OSError:
+                pass
+
+    def lookup(self, profile_url: str) -> List[Dict]:
+        """Requests for a known profile, else the template filled with its slug"""
+        slug = profile_handle(profile_url)
+        if not slug:
+            return []
+        with self._lock:
+            if slug in self._endpoints:
+                return list(self._endpoints[slug])
+            template = self._endpoints.get(SLUG_PLACEHOLDER, [])
+        return [
+            {key: value.replace(SLUG_PLACEHOLDER, slug) if isinstance(value, str) else value
+             for key, value in request.items()}
+            for request in template
+        ]
+
+
+class ApiCapture:
+    """Collects profile API responses on a page during its first load"""
+
+    def __init__(self):
+        self._responses = []
+
+    def on_response(self, response):
+        request = response.request
+        if request.resource_type in ("xhr", "fetch") and is_profile_api_url(response.url):
+            self._responses.append(response)
+
+    def attach(self, page):
+        page.on("response", self.on_response)
+
+    def _replayable(self, request) -> Dict:
+        return {
+            "url": request.url,
+            "method": request.method,
+            "post_data": request.post_data,
+            "headers": {k: v for k, v in request.headers.items() if k.lower() in REPLAY_HEADERS}
+        }
+
+    def collect(self):
+        """Read the captured bodies (sync API); returns (payloads, requests)"""
+        payloads, requests_made = [], []
+        for response in self._responses:
+            try:
+                if response.ok:
+                    payloads.append(response.json())
+                    requests_made.append(self._replayable(response.request))
+            except Exception:
+                continue
+        return payloads, requests_made
+
+    async def collect_async(self):
+        """Read the captured bodies (async API); returns (payloads, requests)"""
+        payloads, requests_made = [], []
+        for response in self._responses:
+            try:
+                if response.ok:
+                    payloads.append(await response.json())
+                    requests_made.append(self._replayable(response.request))
+            except Exception:
+                continue
+        return payloads, requests_made
+
+
+class ApiClient:
+    """Browserless profile fetches that replay captured endpoints over keep-alive HTTP"""
+
+    def __init__(self, registry: EndpointRegistry, pool_size: int = 16, timeout: float = 10.0):
+        self.registry = registry
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(
+        self,
+        profile_url: str,
+        headers: Optional[Dict] = None,
+        etags: Optional[List[Optional[str]]] = None
+    ) -> Optional[Dict]:
+        """
+        Parsed profile JSON (with the endpoints' ``etags``), or None if no
+        endpoint is known or none returned stats. When ``etags`` from a
+        previous fetch are given they are sent as If-None-Match; if every
+        endpoint answers 304 the result is ``{"not_modified": True}``; if
+        only some do, every endpoint is fetched again unconditionally.
+        """
+        endpoints = self.registry.lookup(profile_url)
+        if not endpoints:
+            return None
+        if etags is not None and len(etags) != len(endpoints):
+            etags = None
+
+        payloads, new_etags, not_modified = [], [], 0
+        for i, endpoint in enumerate(endpoints):
+            request_headers = {**(headers or {}), **endpoint.get("headers", {})}
+            if etags and etags[i]:
+                request_headers["If-None-Match"] = etags[i]
+            # Exactly one etag per endpoint, None unless its body was usable
+            etag = None
+            try:
+                response = self.session.request(
+                    endpoint["method"],
+                    endpoint["url"],
+                    data=endpoint.get("post_data"),
+                    headers=request_headers,
+                    timeout=self.timeout
+                )
+                if response.status_code == 304:
+                    not_modified += 1
+                    etag = response.headers.get("ETag") or etags[i]
+                elif response.ok:
+                    payloads.append(response.json())
+                    etag = response.headers.get("ETag")
+            except (requests.RequestException, ValueError):
+                pass
+            new_etags.append(etag)
+
+        if etags and not_modified == len(endpoints):
+            return {"not_modified": True}
+        if not_modified:
+            # The 304 bodies are missing, so the rest is not a whole profile
+            return self.fetch(profile_url, headers=headers)
+
+        parsed = parse_profile_json(payloads)
+        parsed["etags"] = new_etags if any(new_etags) else None
+        return parsed if has_profile_stats(parsed) else None
+
+
+_registry: Optional[EndpointRegistry] = None
+_client: Optional[ApiClient] = None
+_lock = threading.Lock()
+
+
+def get_endpoint_registry() -> EndpointRegistry:
+    global _registry
+    with _lock:
+        if _registry is None:
+            _registry = EndpointRegistry()
+        return _registry
+
+
+def get_api_client() -> ApiClient:
+    global _client
+    registry = get_endpoint_registry()
+    with _lock:
+        if _client is None:
+            _client = ApiClient(registry)
+        return _client
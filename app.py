@@ -1,247 +1,32 @@
+import os
 import streamlit as st
-from playwright.sync_api import sync_playwright
-import pandas as pd
-import re
-import time
+from collections import deque
 from typing import Dict, List
 
-# Agentblazer Requirements Database
-AGENTBLAZER_REQUIREMENTS = {
-    "Champion": {
-        "modules": [
-            "Artificial Intelligence Fundamentals",
-            "Generative AI Basics", 
-            "Natural Language Processing Basics",
-            "Large Language Models",
-            "Data Fundamentals for AI",
-            "Prompt Fundamentals",
-            "Prompt Builder Basics",
-            "Einstein Trust Layer",
-            "Autonomous Agents",
-            "Introduction to Agentforce",
-            "Agentforce for Service"
-        ],
-        "keywords": [
-            "artificial intelligence", "generative ai", "natural language",
-            "large language", "data fundamentals", "prompt fundamentals",
-            "prompt builder", "einstein trust", "autonomous agents", 
-            "agentforce", "service agent"
-        ],
-        "min_points": 2500,
-        "min_keywords": 5
-    },
-    
-    "Innovator": {
-        "modules": [
-            "AI Strategy",
-            "AI+Data: Project Planning", 
-            "Agentforce: Agent Planning",
-            "Trusted Agentic AI",
-            "Agentforce Builder Basics",
-            "Agentforce SDR Setup",
-            "Sales Coach Setup"
-        ],
-        "keywords": [
-            "ai strategy", "project planning", "agent planning",
-            "trusted agentic", "agentforce builder", "agentforce sdr",
-            "sales coach", "superbadge"
-        ],
-        "min_points": 7500,
-        "min_keywords": 4
-    },
-    
-    "Legend": {
-        "modules": [
-            "Agentforce Specialist",
-            "Agent Customization",
-            "Prompt Engineering Techniques",
-            "Agent Customization with Apex",
-            "Data Cloud Experiences",
-            "Retrieval Augmented Generation",
-            "Testing Tools and Strategies"
-        ],
-        "keywords": [
-            "agentforce specialist", "agent customization", "prompt engineering",
-            "apex", "data cloud", "retrieval augmented", "testing tools",
-            "certification", "advanced"
-        ],
-        "min_points": 15000,
-        "min_keywords": 6
-    }
-}
+# Only light modules are imported up front so cold starts and reruns stay
+# fast; pandas, numpy and Playwright (scraper, batch_engine, batch_io,
+# batch_verification, retry_policy) are imported where a scrape, roster
+# upload or re-grade actually needs them. See benchmarks/startup.py.
+from agentblazer import AGENTBLAZER_REQUIREMENTS, verify_agentblazer_badge
+from job_queue import JobQueue
+from metrics import METRICS_PORT, get_metrics, start_metrics_server
+from profile_cache import get_profile_cache
+from profile_urls import ProfileIndex, is_profile_url
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
 def scrape_salesforce_profile(url: str) -> Dict:
     """
-    Scrape Salesforce Trailblazer profile using Playwright
+    Scrape Salesforce Trailblazer profile using Playwright, through the
+    persistent profile cache in ./data
     """
-    try:
-        with sync_playwright() as p:
-            # Launch browser
-            browser = p.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-gpu',
-                    '--disable-web-security'
-                ]
-            )
-            
-            # Create page with realistic settings
-            page = browser.new_page()
-            
-            # Set headers to appear more like a real browser
-            page.set_extra_http_headers({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive'
-            })
-            
-            # Navigate to profile
-            page.goto(url, timeout=30000, wait_until='networkidle')
-            
-            # Wait for dynamic content to load
-            page.wait_for_timeout(5000)
-            
-            # Get page content
-            content = page.content()
-            text_content = page.inner_text('body').lower()
-            
-            # Initialize profile data
-            profile_data = {
-                "points": 0,
-                "badges": 0,
-                "modules": [],
-                "keywords_found": [],
-                "rank": "",
-                "profile_url": url,
-                "success": True
-            }
-            
-            # Extract points using multiple patterns
-            points_patterns = [
-                r'(\d{1,3}(?:,\d{3})*)\s*points?',
-                r'points?[:\s]*(\d{1,3}(?:,\d{3})*)',
-                r'earned[:\s]*(\d{1,3}(?:,\d{3})*)\s*points?',
-                r'total[:\s]*(\d{1,3}(?:,\d{3})*)\s*points?'
-            ]
-            
-            for pattern in points_patterns:
-                points_match = re.search(pattern, text_content)
-                if points_match:
-                    try:
-                        profile_data["points"] = int(points_match.group(1).replace(',', ''))
-                        break
-                    except ValueError:
-                        continue
-            
-            # Extract badges count
-            badge_patterns = [
-                r'(\d+)\s*badges?',
-                r'badges?[:\s]*(\d+)',
-                r'earned[:\s]*(\d+)\s*badges?'
-            ]
-            
-            for pattern in badge_patterns:
-                badge_match = re.search(pattern, text_content)
-                if badge_match:
-                    try:
-                        profile_data["badges"] = int(badge_match.group(1))
-                        break
-                    except ValueError:
-                        continue
-            
-            # Extract rank information
-            rank_patterns = [
-                r'(ranger|adventurer|mountaineer|explorer)',
-                r'rank[:\s]*(ranger|adventurer|mountaineer|explorer)'
-            ]
-            
-            for pattern in rank_patterns:
-                rank_match = re.search(pattern, text_content)
-                if rank_match:
-                    profile_data["rank"] = rank_match.group(1).title()
-                    break
-            
-            # Look for Agentblazer keywords across all levels
-            all_keywords = []
-            for level_req in AGENTBLAZER_REQUIREMENTS.values():
-                all_keywords.extend(level_req["keywords"])
-            
-            # Remove duplicates and find matches
-            unique_keywords = list(set(all_keywords))
-            
-            for keyword in unique_keywords:
-                if keyword in text_content:
-                    profile_data["keywords_found"].append(keyword)
-            
-            # Estimate modules based on keywords (simplified approach)
-            for level, requirements in AGENTBLAZER_REQUIREMENTS.items():
-                matching_keywords = [kw for kw in profile_data["keywords_found"] if kw in requirements["keywords"]]
-                if len(matching_keywords) >= requirements["min_keywords"] // 2:  # At least half the keywords
-                    # Add some modules for this level
-                    sample_modules = requirements["modules"][:len(matching_keywords)]
-                    profile_data["modules"].extend(sample_modules)
-            
-            # Remove duplicate modules
-            profile_data["modules"] = list(set(profile_data["modules"]))
-            
-            browser.close()
-            return profile_data
-            
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "points": 0,
-            "badges": 0,
-            "keywords_found": [],
-            "modules": [],
-            "profile_url": url
-        }
+    import scraper
 
-def verify_agentblazer_badge(profile_data: Dict, target_level: str) -> Dict:
-    """Verify if profile meets Agentblazer badge requirements"""
-    
-    if not profile_data.get("success", False):
-        return {
-            "qualified": False,
-            "error": profile_data.get("error", "Unknown error"),
-            "target_level": target_level
-        }
-    
-    requirements = AGENTBLAZER_REQUIREMENTS[target_level]
-    
-    # Check points requirement
-    points_qualified = profile_data["points"] >= requirements["min_points"]
-    
-    # Check keywords requirement
-    matching_keywords = [kw for kw in profile_data["keywords_found"] if kw in requirements["keywords"]]
-    keywords_qualified = len(matching_keywords) >= requirements["min_keywords"]
-    
-    # Overall qualification
-    overall_qualified = points_qualified and keywords_qualified
-    
-    return {
-        "qualified": overall_qualified,
-        "target_level": target_level,
-        "points": {
-            "actual": profile_data["points"],
-            "required": requirements["min_points"],
-            "qualified": points_qualified
-        },
-        "keywords": {
-            "found": len(matching_keywords),
-            "required": requirements["min_keywords"],
-            "qualified": keywords_qualified,
-            "matching_keywords": matching_keywords
-        },
-        "badge_awarded": target_level if overall_qualified else "Not Qualified",
-        "profile_data": profile_data
-    }
+    return scraper.scrape_with_cache(url)
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    job_queue = JobQueue()
+    get_metrics().register_gauge("scraper_job_queue_depth", "Queued profiles waiting for a worker", job_queue.depth)
+    return job_queue
 
 def main():
     st.set_page_config(
@@ -250,6 +35,9 @@ def main():
         layout="wide"
     )
     
+    # Prometheus /metrics endpoint when SCRAPER_METRICS_PORT is set
+    start_metrics_server()
+    
     st.title("🎭 Playwright-Based Agentblazer Badge Verification")
     st.success("✅ JavaScript-rendered content scraping with Playwright!")
     
@@ -296,7 +84,7 @@ def main():
     if st.button("🎭 Scrape with Playwright & Verify", type="primary"):
         if not profile_url:
             st.error("❌ Please enter a valid profile URL")
-        elif not profile_url.startswith("https://www.salesforce.com/trailblazer/"):
+        elif not is_profile_url(profile_url):
             st.error("❌ Please enter a valid Salesforce trailblazer URL")
         else:
             with st.spinner("🎭 Playwright is scraping the profile..."):
@@ -304,7 +92,10 @@ def main():
                 profile_data = scrape_salesforce_profile(profile_url)
                 
                 if not profile_data.get("success", False):
-                    st.error(f"❌ Scraping failed: {profile_data.get('error', 'Unknown error')}")
+                    st.error(
+                        f"❌ Scraping failed [{profile_data.get('error_code', 'unknown')}] after "
+                        f"{profile_data.get('attempts', 1)} attempt(s): {profile_data.get('error', 'Unknown error')}"
+                    )
                     st.info("💡 Common issues:")
                     st.write("• Profile is private or restricted")
                     st.write("• Network connectivity problems")
@@ -318,6 +109,13 @@ def main():
             # Display results
             st.subheader("📊 Playwright Scraping & Verification Results")
             
+            if profile_data.get("timings_ms"):
+                with st.expander("⏱️ Stage Timings"):
+                    st.dataframe(
+                        {"Stage": list(profile_data["timings_ms"]), "ms": list(profile_data["timings_ms"].values())},
+                        use_container_width=True
+                    )
+            
             if verification["qualified"]:
                 st.success(f"🎉 **QUALIFIED for {verification['badge_awarded']} Badge!**")
                 st.balloons()
@@ -334,13 +132,18 @@ def main():
                 
                 with col2:
                     st.metric("Keywords Found", len(profile_data['keywords_found']))
-                    st.metric("Estimated Modules", len(profile_data['modules']))
+                    st.metric("Requirement Modules Earned", len(profile_data.get('modules', [])))
                 
                 with col3:
                     if profile_data['rank']:
                         st.metric("Trailblazer Rank", profile_data['rank'])
                     else:
                         st.metric("Rank", "Not detected")
+                
+                if profile_data.get('ready_via'):
+                    st.caption(f"Page ready via `{profile_data['ready_via']}` after {profile_data['ready_ms']:,.0f} ms")
+                if profile_data.get('source'):
+                    st.caption(f"Data source: `{profile_data['source']}`")
             
             # Detailed verification results
             col1, col2 = st.columns(2)
@@ -371,6 +174,16 @@ def main():
                     with st.expander("View Matching Keywords"):
                         for keyword in keywords_data["matching_keywords"]:
                             st.write(f"✅ {keyword.title()}")
+                
+                modules_data = verification["modules"]
+                st.caption(
+                    f"📘 {modules_data['found']} of {modules_data['total']} {target_level} modules "
+                    f"found among earned badge titles"
+                )
+                if modules_data["matching_modules"]:
+                    with st.expander("View Earned Requirement Modules"):
+                        for module in modules_data["matching_modules"]:
+                            st.write(f"✅ {module}")
     
     # Batch Processing
     st.divider()
@@ -379,72 +192,133 @@ def main():
     uploaded_file = st.file_uploader("Upload CSV with profile URLs", type="csv")
     
     if uploaded_file:
-        df = pd.read_csv(uploaded_file)
+        import pandas as pd
+        from batch_engine import DEFAULT_CONCURRENCY, DEFAULT_REQUESTS_PER_SECOND, run_batches
+        from batch_io import ResultWriter, RosterReader, export_path_for, read_results, result_row_count, row_key
+        from resource_blocking import BLOCK_RESOURCES, ResourceBlocker
+        from retry_policy import get_circuit_breaker
         
-        required_columns = ["Roll Number", "Name", "Salesforce URL"]
-        if all(col in df.columns for col in required_columns):
-            st.success(f"✅ Loaded {len(df)} students for Playwright batch processing")
-            st.dataframe(df.head())
+        # The roster is streamed in chunks; only a preview is kept in memory
+        try:
+            roster_counts = RosterReader(uploaded_file).summary()
+            preview = pd.DataFrame(next(iter(RosterReader(uploaded_file, chunksize=5, limit=5)), []))
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            roster_counts = None
+        
+        if roster_counts and not roster_counts["valid"]:
+            st.error("❌ No rows with a valid Salesforce trailblazer URL")
+        elif roster_counts:
+            st.success(f"✅ Loaded {roster_counts['valid']} students for Playwright batch processing")
+            if roster_counts["invalid"] or roster_counts["duplicates"]:
+                st.caption(
+                    f"Skipped {roster_counts['invalid']} rows without a valid profile URL and "
+                    f"{roster_counts['duplicates']} duplicate rows"
+                )
+            st.dataframe(preview)
             
             batch_level = st.selectbox("Batch Verification Level:", ["Champion", "Innovator", "Legend"], key="batch")
-            max_profiles = st.number_input("Max profiles to process:", 1, len(df), min(5, len(df)))
+            max_profiles = st.number_input(
+                "Max profiles to process:", 1, roster_counts["valid"], min(5, roster_counts["valid"])
+            )
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                concurrency = st.number_input("Profiles scraped in parallel:", 1, 32, DEFAULT_CONCURRENCY)
+            with col2:
+                requests_per_second = st.number_input(
+                    "Max requests per second per host:", 0.1, 20.0, DEFAULT_REQUESTS_PER_SECOND, step=0.5
+                )
+            
+            profile_cache = get_profile_cache()
+            refresh_stale_only = st.checkbox(
+                "Refresh only stale rows (reuse cached profiles that have not expired)",
+                value=True
+            )
+            stale_count = sum(
+                len(profile_cache.stale_urls([row["Salesforce URL"] for row in chunk]))
+                for chunk in RosterReader(uploaded_file, limit=max_profiles)
+            )
+            st.caption(f"💾 {max_profiles - stale_count} of {max_profiles} profiles are fresh in the cache")
+            
+            # Results are appended to this file as they are scored
+            export_format = st.radio("Results file format:", ["csv", "parquet"], horizontal=True)
+            export_path = export_path_for(uploaded_file.getvalue(), batch_level, export_format)
+            # Off by default: resumed rows are not re-scraped, whatever the cache TTLs say
+            resume_export = st.checkbox(
+                "Resume: skip rows already in the results file from an earlier or interrupted run",
+                value=False
+            )
+            
+            if st.button("🛰️ Submit as Background Job", help="Queued for the shared worker pool; survives page refreshes"):
+                job_id = get_job_queue().submit(
+                    RosterReader(uploaded_file, limit=max_profiles).rows(),
+                    batch_level,
+                    options={"refresh": not refresh_stale_only}
+                )
+                st.success(f"✅ Submitted background job `{job_id}` - follow it under Background Jobs below")
             
             if st.button("🎭 Start Playwright Batch Processing", type="primary"):
                 
-                batch_results = []
                 progress_bar = st.progress(0)
                 status_text = st.empty()
+                results_table = st.empty()
+                recent_rows = deque(maxlen=20)
                 
-                profiles_to_process = df.head(max_profiles)
-                
-                for idx, row in profiles_to_process.iterrows():
-                    progress = (idx + 1) / max_profiles
-                    progress_bar.progress(progress)
-                    status_text.text(f"🎭 Playwright processing {idx+1}/{max_profiles}: {row['Name']}")
+                blocker = ResourceBlocker() if BLOCK_RESOURCES else None
+                profile_index = ProfileIndex()
+                with ResultWriter(export_path, resume=resume_export, retry_failed=True) as writer:
+                    done = len(writer.completed)
                     
-                    # Scrape profile
-                    profile_data = scrape_salesforce_profile(row['Salesforce URL'])
-                    
-                    if profile_data.get("success", False):
-                        # Verify requirements
-                        verification = verify_agentblazer_badge(profile_data, batch_level)
-                        
-                        batch_results.append({
-                            "Roll Number": row["Roll Number"],
-                            "Name": row["Name"],
-                            "Profile URL": row["Salesforce URL"],
-                            "Target Level": batch_level,
-                            "Points": profile_data["points"],
-                            "Keywords Found": len(profile_data["keywords_found"]),
-                            "Qualified": "Yes" if verification["qualified"] else "No",
-                            "Badge Awarded": verification["badge_awarded"],
-                            "Status": "Playwright Success"
-                        })
-                    else:
-                        batch_results.append({
-                            "Roll Number": row["Roll Number"],
-                            "Name": row["Name"],
-                            "Profile URL": row["Salesforce URL"],
-                            "Target Level": batch_level,
-                            "Points": 0,
-                            "Keywords Found": 0,
-                            "Qualified": "No",
-                            "Badge Awarded": "Error",
-                            "Status": f"Failed: {profile_data.get('error', 'Unknown')[:50]}"
-                        })
+                    def show_result(index: int, result: Dict, completed: int, total: int):
+                        # Append to the results file, then stream into the progress bar and table
+                        nonlocal done
+                        writer.write(result)
+                        done += 1
+                        recent_rows.append(result)
+                        progress_bar.progress(min(1.0, done / max_profiles))
+                        status_text.text(f"🎭 Playwright processed {done}/{max_profiles}: {result['Name']}")
+                        results_table.dataframe(pd.DataFrame(list(recent_rows)), use_container_width=True)
                     
-                    # Small delay between requests
-                    time.sleep(2)
+                    pending_chunks = (
+                        [
+                            row for row in chunk
+                            if row_key(row["Roll Number"], row["Salesforce URL"]) not in writer.completed
+                        ]
+                        for chunk in RosterReader(uploaded_file, limit=max_profiles)
+                    )
+                    # One browser for the whole run; browser failures come back as failed rows
+                    try:
+                        run_batches(
+                            pending_chunks,
+                            batch_level,
+                            concurrency=concurrency,
+                            requests_per_second=requests_per_second,
+                            on_result=show_result,
+                            blocker=blocker,
+                            cache=profile_cache,
+                            refresh_stale_only=refresh_stale_only,
+                            index=profile_index
+                        )
+                    except Exception as e:
+                        st.error(f"❌ Batch stopped after {done} profiles: {e}")
+                results_table.empty()
+                if profile_index.scrapes_saved:
+                    st.info(
+                        f"♻️ {profile_index.rows_seen} rows referenced {profile_index.profiles} unique profiles - "
+                        f"saved {profile_index.scrapes_saved} duplicate scrapes"
+                    )
                 
                 # Display batch results
-                if batch_results:
-                    results_df = pd.DataFrame(batch_results)
+                results_df = read_results(export_path)
+                if not results_df.empty:
                     
                     # Summary metrics
-                    qualified_count = len(results_df[results_df["Qualified"] == "Yes"])
+                    qualified_count = int(results_df["Qualified"].eq("Yes").sum())
                     total_count = len(results_df)
-                    success_count = len(results_df[results_df["Status"] == "Playwright Success"])
-                    avg_points = results_df[results_df["Points"] > 0]["Points"].mean() if len(results_df[results_df["Points"] > 0]) > 0 else 0
+                    success_count = int(results_df["Status"].eq("Playwright Success").sum())
+                    avg_points = results_df["Points"].where(results_df["Points"] > 0).mean()
+                    avg_points = 0 if pd.isna(avg_points) else avg_points
                     
                     col1, col2, col3, col4 = st.columns(4)
                     
@@ -457,19 +331,132 @@ def main():
                     with col4:
                         st.metric("Avg Points", f"{avg_points:,.0f}")
                     
+                    error_codes = results_df.loc[results_df["Error Code"].fillna("") != "", "Error Code"].value_counts()
+                    if not error_codes.empty:
+                        breaker = get_circuit_breaker().stats()
+                        st.warning(
+                            f"⚠️ Failures by cause: {', '.join(f'{code}: {n}' for code, n in error_codes.items())}"
+                            f" (circuit breaker tripped {breaker['trips']} time(s))"
+                        )
+                    
+                    if blocker:
+                        network = blocker.stats()
+                        st.caption(
+                            f"Blocked {network['requests_blocked']:,} of {network['requests_seen']:,} requests "
+                            f"({', '.join(f'{k}: {v}' for k, v in network['blocked_by_reason'].items()) or 'none'}); "
+                            f"downloaded {network['allowed_bytes'] / 1024:,.0f} KB"
+                        )
+                    
                     st.dataframe(results_df, use_container_width=True)
+            
+            # Serve the results file as written so far (also after an interrupted run)
+            written = result_row_count(export_path)
+            if written:
+                with open(export_path, "rb") as f:
+                    st.download_button(
+                        "📥 Download Playwright Batch Results" if written >= max_profiles
+                        else f"📥 Download results so far ({written}/{max_profiles})",
+                        f.read(),
+                        os.path.basename(export_path),
+                        "text/csv" if export_format == "csv" else "application/octet-stream"
+                    )
+    
+    # Background jobs submitted from this or any other session
+    job_queue = get_job_queue()
+    jobs = job_queue.list_jobs(limit=10)
+    if jobs:
+        st.divider()
+        st.subheader("🛰️ Background Jobs")
+        
+        workers = job_queue.workers()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Workers Online", len(workers))
+        col2.metric("Busy Workers", sum(worker["busy"] for worker in workers))
+        col3.metric("Queued Profiles", job_queue.depth())
+        if not workers:
+            st.warning("⚠️ No worker is running. Start one with `python -m cli worker`.")
+        st.button("🔄 Refresh job status")
+        
+        for job in jobs:
+            total = job["total"]
+            completed = job["completed"]
+            st.progress(
+                completed / total if total else 0.0,
+                text=(
+                    f"`{job['job_id']}` · {job['level']} · {job['status']} · {completed}/{total} profiles "
+                    f"({job['failed']} failed, {job['retrying']} retrying)"
+                )
+            )
+            col1, col2 = st.columns([1, 4])
+            with col1:
+                if job["status"] in ("queued", "running"):
+                    if st.button("⏹️ Cancel", key=f"cancel-{job['job_id']}"):
+                        job_queue.cancel(job["job_id"])
+                        st.rerun()
+            with col2:
+                job_results = job_queue.results(job["job_id"])
+                if job_results:
+                    import pandas as pd
                     
-                    # Download results
-                    csv_data = results_df.to_csv(index=False)
                     st.download_button(
-                        "📥 Download Playwright Batch Results",
-                        csv_data,
-                        f"playwright_agentblazer_{batch_level.lower()}_results.csv",
-                        "text/csv"
+                        "📥 Download results" if job["status"] == "finished" else "📥 Download results so far",
+                        pd.DataFrame(job_results).to_csv(index=False),
+                        f"agentblazer_job_{job['job_id']}.csv",
+                        "text/csv",
+                        key=f"download-{job['job_id']}"
                     )
+    
+    # Re-grade everything already scraped against the current requirements
+    with st.expander("♻️ Re-grade Cached Profiles"):
+        st.write("Evaluates every successfully scraped profile in the cache against all levels without scraping again.")
+        if st.button("Re-grade cached profiles"):
+            import pandas as pd
+            from batch_verification import summarize_grades, verify_agentblazer_batch
+            
+            cached_profiles = pd.DataFrame(list(get_profile_cache().iter_profiles()))
+            if cached_profiles.empty:
+                st.info("No cached profiles yet")
+            else:
+                graded = verify_agentblazer_batch(cached_profiles)
+                level_counts = summarize_grades(graded)
+                columns = st.columns(len(level_counts) + 1)
+                columns[0].metric("Cached Profiles", len(graded))
+                for column, (level, count) in zip(columns[1:], level_counts.items()):
+                    column.metric(f"{level} Qualified", count)
+                st.dataframe(
+                    pd.concat([cached_profiles[["profile_url", "points"]], graded], axis=1),
+                    use_container_width=True
+                )
+    
+    # Where the time goes, to tune pool size and concurrency
+    with st.expander("📈 Diagnostics"):
+        snapshot = get_metrics().snapshot()
+        gauges = {name: sum(values.values()) for name, values in snapshot["gauges"].items()}
         
+        col1, col2, col3, col4 = st.columns(4)
+        pool_size = gauges.get("scraper_browser_pool_size", 0)
+        pool_busy = gauges.get("scraper_browser_pool_busy", 0)
+        col1.metric("Browser Pool Busy", f"{pool_busy:.0f}/{pool_size:.0f}" if pool_size else "not started")
+        col2.metric("Pool Queue Depth", f"{gauges.get('scraper_browser_pool_queue_depth', 0):.0f}")
+        batch_slots = gauges.get("scraper_batch_concurrency", 0)
+        col3.metric(
+            "Batch Pages In Flight",
+            f"{gauges.get('scraper_batch_in_flight', 0):.0f}/{batch_slots:.0f}" if batch_slots else "idle"
+        )
+        col4.metric("Job Queue Depth", get_job_queue().depth())
+        
+        if snapshot["stages"]:
+            import pandas as pd
+            
+            stages = pd.DataFrame.from_dict(snapshot["stages"], orient="index").sort_values("mean_ms", ascending=False)
+            st.dataframe(stages, use_container_width=True)
         else:
-            st.error(f"❌ CSV must contain columns: {', '.join(required_columns)}")
+            st.info("No scrapes timed in this process yet")
+        
+        for name, values in snapshot["counters"].items():
+            st.caption(f"{name}: " + ", ".join(f"{labels} = {value:,.0f}" for labels, value in values.items()))
+        if METRICS_PORT:
+            st.caption(f"Prometheus metrics: http://<host>:{METRICS_PORT}/metrics")
     
     # Usage Tips
     st.divider()
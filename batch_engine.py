@@ -0,0 +1,429 @@
+"""
+Concurrent asyncio batch engine for verifying many profiles at once
+"""
+import asyncio
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+
+from agentblazer import verify_agentblazer_badge
+from api_capture import ApiCapture, get_endpoint_registry, has_profile_stats, parse_profile_json
+from browser_pool import BROWSER_LAUNCH_ARGS
+from metrics import STAGE_METRIC, StageTimings, get_metrics
+from page_extraction import ARCHIVE_HTML, archive_page_async, extract_page_until_async
+from profile_cache import ProfileCache
+from profile_urls import ProfileIndex
+from readiness import wait_for_profile_ready_async
+from resource_blocking import BLOCK_RESOURCES, ResourceBlocker
+from retry_policy import (
+    CircuitBreaker,
+    RetryPolicy,
+    check_blocked,
+    check_response,
+    classify_error,
+    get_circuit_breaker
+)
+from scraper import (
+    BROWSER_HEADERS,
+    SCRAPER_MODE,
+    build_profile_data,
+    failed_profile_data,
+    fetch_profile_http,
+    levels_decided_for,
+    merge_api_data
+)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_SECOND = 1.0
+
+# Called as on_result(index, result_row, completed_count, total_count)
+ResultCallback = Callable[[int, Dict, int, int], None]
+
+
+class HostRateLimiter:
+    """Spaces out navigation starts so each host sees at most N requests per second"""
+
+    def __init__(self, requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def wait(self, url: str):
+        if not self.interval:
+            return
+
+        host = urlparse(url).netloc.lower()
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+            if slot > now:
+                await asyncio.sleep(slot - now)
+
+
+def build_batch_row(row: Dict, target_level: str, profile_data: Dict) -> Dict:
+    """Build one row of the batch results table from a scraped profile"""
+    if profile_data.get("success", False):
+        # Verify requirements
+        started = time.perf_counter()
+        verification = verify_agentblazer_badge(profile_data, target_level)
+        get_metrics().observe(STAGE_METRIC, time.perf_counter() - started, stage="verify")
+
+        return {
+            "Roll Number": row["Roll Number"],
+            "Name": row["Name"],
+            "Profile URL": row["Salesforce URL"],
+            "Target Level": target_level,
+            "Points": profile_data["points"],
+            "Keywords Found": len(profile_data["keywords_found"]),
+            "Qualified": "Yes" if verification["qualified"] else "No",
+            "Badge Awarded": verification["badge_awarded"],
+            "Status": "Playwright Success",
+            "Error Code": ""
+        }
+
+    return {
+        "Roll Number": row["Roll Number"],
+        "Name": row["Name"],
+        "Profile URL": row["Salesforce URL"],
+        "Target Level": target_level,
+        "Points": 0,
+        "Keywords Found": 0,
+        "Qualified": "No",
+        "Badge Awarded": "Error",
+        "Status": f"Failed: {profile_data.get('error_code', 'unknown')}",
+        "Error Code": profile_data.get("error_code", "unknown")
+    }
+
+
+async def _scrape_page_async(
+    browser,
+    url: str,
+    blocker: Optional[ResourceBlocker] = None,
+    timings: Optional[StageTimings] = None
+) -> Dict:
+    """Scrape one profile in its own context of a shared async browser"""
+    timings = timings or StageTimings()
+    context = None
+    try:
+        # One stage for context and page creation
+        with timings.stage("new_page"):
+            context = await browser.new_context(extra_http_headers=BROWSER_HEADERS)
+            if blocker:
+                await blocker.install_async(context)
+
+            page = await context.new_page()
+
+            # Keep the profile's backend JSON responses as they arrive
+            capture = ApiCapture()
+            capture.attach(page)
+
+        # Navigate to profile; error statuses (429, 5xx, 404...) raise ScrapeError
+        with timings.stage("goto"):
+            response = await page.goto(url, timeout=30000, wait_until='domcontentloaded')
+        check_response(response, url)
+
+        # Wait until the profile stats have rendered (bounded)
+        with timings.stage("ready_wait"):
+            ready_via, ready_ms = await wait_for_profile_ready_async(page)
+
+        # One in-page evaluation returns only the fields we need; more badges
+        # are loaded only while some level is still undecided (judged with any
+        # API stats already captured, which override the DOM values)
+        with timings.stage("extract"):
+            early_payloads, _ = await capture.collect_async()
+            api = parse_profile_json(early_payloads) if early_payloads else None
+            extracted = await extract_page_until_async(page, lambda found: levels_decided_for(found, api))
+        check_blocked(extracted["short_text"], url)
+        profile_data = build_profile_data(extracted, url)
+        profile_data["source"] = "dom"
+
+        # Raw HTML only in debug/archive mode
+        if ARCHIVE_HTML:
+            with timings.stage("archive"):
+                profile_data["archive_path"] = await archive_page_async(page, url)
+
+        with timings.stage("api_merge"):
+            payloads, requests_made = await capture.collect_async()
+            if payloads:
+                parsed = parse_profile_json(payloads)
+                if has_profile_stats(parsed):
+                    merge_api_data(profile_data, parsed)
+                    get_endpoint_registry().record(url, requests_made)
+
+        profile_data["ready_via"] = ready_via
+        profile_data["ready_ms"] = round(ready_ms, 1)
+        return profile_data
+
+    finally:
+        if context is not None:
+            await context.close()
+
+
+async def scrape_profile_async(
+    browser,
+    url: str,
+    blocker: Optional[ResourceBlocker] = None,
+    policy: Optional[RetryPolicy] = None,
+    breaker: Optional[CircuitBreaker] = None
+) -> Dict:
+    """
+    Scrape one profile, retrying transient errors with jittered backoff and
+    pausing while the shared circuit breaker is open. Raises the
+    ``browser_crash`` error once the browser itself has disconnected.
+    """
+    policy = policy or RetryPolicy()
+    breaker = breaker or get_circuit_breaker()
+    metrics = get_metrics()
+    timings = StageTimings(metrics)
+    started = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        with timings.stage("breaker_wait"):
+            pause = breaker.wait_seconds()
+            while pause > 0:
+                await asyncio.sleep(pause)
+                pause = breaker.wait_seconds()
+        try:
+            profile_data = await _scrape_page_async(browser, url, blocker, timings)
+        except Exception as e:
+            error = classify_error(e)
+            if error.code == "browser_crash" and not browser.is_connected():
+                # Retrying against a dead browser cannot succeed: give the
+                # whole batch back to the caller to relaunch
+                raise error
+            breaker.record(False, error)
+            metrics.inc("scraper_attempt_errors_total", error_code=error.code)
+            if not policy.should_retry(error, attempt):
+                timings.record("total", time.perf_counter() - started)
+                metrics.inc("scraper_profiles_total", outcome="error", source="dom")
+                profile_data = failed_profile_data(url, str(error), error.code, attempt)
+                profile_data["timings_ms"] = timings.ms
+                return profile_data
+            with timings.stage("backoff"):
+                await asyncio.sleep(policy.delay(error, attempt))
+            continue
+        breaker.record(True)
+        timings.record("total", time.perf_counter() - started)
+        metrics.inc("scraper_profiles_total", outcome="success", source=profile_data.get("source", "dom"))
+        profile_data["attempts"] = attempt
+        profile_data["timings_ms"] = timings.ms
+        return profile_data
+
+
+async def run_batch_async(
+    rows: List[Dict],
+    target_level: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    on_result: Optional[ResultCallback] = None,
+    blocker: Optional[ResourceBlocker] = None,
+    cache: Optional[ProfileCache] = None,
+    refresh_stale_only: bool = True,
+    index: Optional[ProfileIndex] = None,
+    browser=None
+) -> List[Dict]:
+    """
+    Scrape and verify roster rows with at most ``concurrency`` pages in flight.
+
+    ``on_result`` is invoked as each row finishes (in completion order);
+    the returned list keeps the input row order. Rows are grouped by
+    canonical profile URL first, so a profile listed several times (in any
+    URL spelling) is scraped once; pass a ``ProfileIndex`` to read how many
+    scrapes that saved. Pass a ``ResourceBlocker`` to read the run's
+    blocked-request counters afterwards; one is created automatically when
+    resource blocking is enabled. With a ``cache``, profiles that are still
+    fresh are answered from it (unless ``refresh_stale_only`` is False) and
+    every new scrape is stored. A ``browser`` passed in is used as is and
+    left open; otherwise one is launched for this call.
+    """
+    results: List[Optional[Dict]] = [None] * len(rows)
+    if not rows:
+        return []
+    if browser is None:
+        async with async_playwright() as p:
+            browser = await launch_batch_browser(p)
+            try:
+                return await run_batch_async(
+                    rows, target_level, concurrency=concurrency, requests_per_second=requests_per_second,
+                    on_result=on_result, blocker=blocker, cache=cache, refresh_stale_only=refresh_stale_only,
+                    index=index, browser=browser
+                )
+            finally:
+                await browser.close()
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    limiter = HostRateLimiter(requests_per_second)
+    if blocker is None and BLOCK_RESOURCES:
+        blocker = ResourceBlocker()
+    index = index or ProfileIndex()
+    groups = index.group(rows)
+
+    metrics = get_metrics()
+    metrics.set_gauge("scraper_batch_concurrency", max(1, concurrency))
+
+    async def scrape(url: str) -> Dict:
+        # Profiles seen in an earlier chunk of the same run were just scraped
+        use_cache = refresh_stale_only or url in index.repeated
+        entry = cache.lookup(url) if cache and use_cache else None
+        if entry and entry["fresh"]:
+            metrics.inc("scraper_cache_requests_total", result="hit")
+            return entry["data"]
+
+        async with semaphore:
+            metrics.add_gauge("scraper_batch_in_flight", 1)
+            try:
+                with StageTimings(metrics).stage("rate_limit_wait"):
+                    await limiter.wait(url)
+                profile_data = None
+                if SCRAPER_MODE == "http":
+                    etags = entry["etags"] if entry else None
+                    with StageTimings(metrics).stage("http_fetch"):
+                        profile_data = await asyncio.to_thread(fetch_profile_http, url, etags)
+                    if profile_data and profile_data.get("not_modified"):
+                        cache.touch(url)
+                        metrics.inc("scraper_cache_requests_total", result="revalidated")
+                        return entry["data"]
+                if not profile_data:
+                    profile_data = await scrape_profile_async(browser, url, blocker)
+            finally:
+                metrics.add_gauge("scraper_batch_in_flight", -1)
+
+        etags = profile_data.pop("etags", None)
+        if cache:
+            metrics.inc("scraper_cache_requests_total", result="miss")
+            cache.put(url, profile_data, etags=etags)
+        return profile_data
+
+    async def process(url: str, positions: List[int]):
+        # One scrape per canonical profile, fanned out to all of its rows
+        profile_data = await scrape(url)
+        return [(i, build_batch_row(rows[i], target_level, profile_data)) for i in positions]
+
+    tasks = [asyncio.create_task(process(url, positions)) for url, positions in groups.items()]
+    try:
+        completed = 0
+        for next_done in asyncio.as_completed(tasks):
+            for i, result in await next_done:
+                results[i] = result
+                completed += 1
+                if on_result:
+                    on_result(i, result, completed, len(rows))
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Diagnostics shows "idle" again once the batch is over
+        metrics.set_gauge("scraper_batch_concurrency", 0)
+
+    return results
+
+
+async def launch_batch_browser(p):
+    started = time.perf_counter()
+    browser = await p.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+    get_metrics().observe(STAGE_METRIC, time.perf_counter() - started, stage="browser_launch")
+    return browser
+
+
+def _report_failed_rows(rows: List[Dict], target_level: str, error: Exception, finished: set,
+                        on_result: ResultCallback):
+    """Report every row not in ``finished`` as failed with ``error``"""
+    error = classify_error(error)
+    for index, row in enumerate(rows):
+        if index not in finished:
+            profile_data = failed_profile_data(row["Salesforce URL"], str(error), error.code)
+            on_result(index, build_batch_row(row, target_level, profile_data), len(finished) + 1, len(rows))
+
+
+class BatchBrowser:
+    """
+    One Playwright driver and Chromium kept open across many batches (a
+    run's chunks, a worker's claim rounds); ``get`` relaunches the browser
+    after a crash or disconnect. If the driver cannot start, ``get`` raises
+    that error so callers can fail their rows instead of aborting.
+    """
+
+    def __init__(self):
+        self._playwright = None
+        self._driver_error: Optional[Exception] = None
+        self._browser = None
+
+    async def __aenter__(self) -> "BatchBrowser":
+        try:
+            self._playwright = await async_playwright().start()
+        except Exception as e:
+            self._driver_error = e
+        return self
+
+    async def get(self):
+        if self._playwright is None:
+            raise self._driver_error
+        if self._browser is None or not self._browser.is_connected():
+            self._browser = await launch_batch_browser(self._playwright)
+        return self._browser
+
+    async def __aexit__(self, *exc_info):
+        try:
+            if self._browser is not None:
+                await self._browser.close()
+        finally:
+            if self._playwright is not None:
+                await self._playwright.stop()
+
+
+async def run_batches_async(chunks: Iterable[List[Dict]], target_level: str, **kwargs) -> int:
+    """
+    ``run_batch_async`` over every chunk of rows (e.g. from ``RosterReader``)
+    with one browser for the whole run; ``on_result`` indexes are positions
+    within the current chunk. A browser-level failure (missing driver,
+    launch failure, crash) does not abort the run: after a crash the rows
+    of the chunk that did not finish are retried once in a relaunched
+    browser, and any other failure reports them as failed rows. Returns
+    the number of rows processed.
+    """
+    on_result: Optional[ResultCallback] = kwargs.pop("on_result", None)
+    processed = 0
+    finished: set = set()
+
+    def chunk_result(index, result, completed, total):
+        finished.add(index)
+        if on_result:
+            on_result(index, result, completed, total)
+
+    async with BatchBrowser() as browsers:
+        for rows in chunks:
+            finished.clear()
+            pending = list(range(len(rows)))
+            for relaunched in (False, True):
+                def pending_result(index, result, completed, total, pending=pending):
+                    chunk_result(pending[index], result, len(finished) + 1, len(rows))
+
+                try:
+                    browser = await browsers.get()
+                    await run_batch_async(
+                        [rows[i] for i in pending], target_level, on_result=pending_result, browser=browser, **kwargs
+                    )
+                    break
+                except Exception as e:
+                    # After a crash, the unfinished rows get one fresh browser
+                    if relaunched or classify_error(e).code != "browser_crash":
+                        _report_failed_rows(rows, target_level, e, finished, chunk_result)
+                        break
+                    pending = [i for i in pending if i not in finished]
+            processed += len(rows)
+    return processed
+
+
+def run_batch(rows: List[Dict], target_level: str, **kwargs) -> List[Dict]:
+    """Synchronous entry point (e.g. from the Streamlit script thread)"""
+    return asyncio.run(run_batch_async(rows, target_level, **kwargs))
+
+
+def run_batches(chunks: Iterable[List[Dict]], target_level: str, **kwargs) -> int:
+    """Synchronous entry point for ``run_batches_async``"""
+    return asyncio.run(run_batches_async(chunks, target_level, **kwargs))
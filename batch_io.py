@@ -0,0 +1,225 @@
+"""
+Streaming roster ingestion and incremental, resumable storage for batch
+verification results
+"""
+import hashlib
+import io
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from profile_cache import DATA_DIR
+from profile_urls import is_profile_url, normalize_profile_url
+
+REQUIRED_COLUMNS = ["Roll Number", "Name", "Salesforce URL"]
+ROSTER_CHUNK_ROWS = int(os.environ.get("ROSTER_CHUNK_ROWS", "500"))
+EXPORT_DIR = os.environ.get("BATCH_EXPORT_DIR", os.path.join(DATA_DIR, "exports"))
+
+RESULT_COLUMNS = [
+    "Roll Number",
+    "Name",
+    "Profile URL",
+    "Target Level",
+    "Points",
+    "Keywords Found",
+    "Qualified",
+    "Badge Awarded",
+    "Status",
+    "Error Code"
+]
+
+
+def row_key(roll_number, url) -> Tuple[str, str]:
+    """Identity of a roster row across runs"""
+    return str(roll_number).strip(), str(url).strip()
+
+
+def check_columns(columns):
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise ValueError(f"CSV must contain columns: {', '.join(REQUIRED_COLUMNS)}")
+
+
+class RosterReader:
+    """
+    Streams a roster CSV (path or file object) in chunks of valid rows.
+
+    Only ``chunksize`` rows are parsed at a time. Rows without a Trailblazer
+    profile URL are counted in ``invalid`` and rows repeating an earlier
+    (roll number, profile) pair in ``duplicates``; neither is yielded.
+    ``limit`` stops after that many valid rows. File objects are rewound,
+    so a reader can be iterated more than once.
+    """
+
+    def __init__(self, source, chunksize: int = ROSTER_CHUNK_ROWS, limit: Optional[int] = None):
+        self.source = source
+        self.chunksize = chunksize
+        self.limit = limit
+        self.rows_read = 0
+        self.valid = 0
+        self.invalid = 0
+        self.duplicates = 0
+
+    def __iter__(self) -> Iterator[List[Dict]]:
+        self.rows_read = self.valid = self.invalid = self.duplicates = 0
+        if hasattr(self.source, "seek"):
+            self.source.seek(0)
+
+        source = self.source
+        if hasattr(source, "read") and not isinstance(source, io.TextIOBase):
+            # pandas closes binary buffers it wraps itself; an upload must survive re-reads
+            source = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        try:
+            yield from self._read_chunks(source)
+        finally:
+            if source is not self.source:
+                source.detach()
+
+    def _read_chunks(self, source) -> Iterator[List[Dict]]:
+        seen: Set[Tuple[str, str]] = set()
+        chunks = pd.read_csv(source, chunksize=self.chunksize, dtype=str, keep_default_na=False)
+        for chunk in chunks:
+            check_columns(chunk.columns)
+            rows = []
+            for row in chunk.to_dict("records"):
+                self.rows_read += 1
+                row["Salesforce URL"] = row["Salesforce URL"].strip()
+                if not is_profile_url(row["Salesforce URL"]):
+                    self.invalid += 1
+                    continue
+                key = (row["Roll Number"].strip(), normalize_profile_url(row["Salesforce URL"]))
+                if key in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(key)
+                rows.append(row)
+                self.valid += 1
+                if self.limit and self.valid >= self.limit:
+                    break
+            if rows:
+                yield rows
+            if self.limit and self.valid >= self.limit:
+                return
+
+    def rows(self) -> Iterator[Dict]:
+        for chunk in self:
+            yield from chunk
+
+    def summary(self) -> Dict[str, int]:
+        """One pass over the roster, counting without keeping any rows"""
+        for _ in self:
+            pass
+        return {"rows": self.rows_read, "valid": self.valid, "invalid": self.invalid, "duplicates": self.duplicates}
+
+
+class ResultWriter:
+    """
+    Appends batch result rows to CSV or Parquet as soon as they are scored.
+
+    CSV rows are appended and flushed one by one without being kept in
+    memory, so the file can be read (and downloaded) at any point. Parquet
+    files cannot be appended to, so rows are buffered and the file is
+    rewritten every ``flush_every`` rows (and on close). With ``resume`` an existing output
+    is kept and ``completed`` holds the keys already written; with
+    ``retry_failed`` error rows are dropped from it first so they run again.
+    """
+
+    def __init__(self, path: str, resume: bool = False, retry_failed: bool = False, flush_every: int = 25,
+                 columns: List[str] = RESULT_COLUMNS):
+        self.path = path
+        self.columns = columns
+        self.format = "parquet" if path.endswith(".parquet") else "csv"
+        self.flush_every = flush_every
+        self.completed: Set[Tuple[str, str]] = set()
+        self._rows: List[Dict] = []
+        self._pending = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        existing = self._read_existing() if resume else None
+        if existing is not None:
+            if retry_failed:
+                existing = existing[existing["Badge Awarded"] != "Error"]
+            self._rows = existing.to_dict("records")
+            self.completed = {row_key(r["Roll Number"], r["Profile URL"]) for r in self._rows}
+        self._rewrite()
+        if self.format == "csv":
+            self._rows = []
+
+    def _read_existing(self) -> Optional[pd.DataFrame]:
+        if not os.path.exists(self.path):
+            return None
+        if self.format == "parquet":
+            return pd.read_parquet(self.path)
+        return pd.read_csv(self.path, dtype={"Roll Number": str})
+
+    def _rewrite(self):
+        frame = pd.DataFrame(self._rows, columns=self.columns)
+        tmp_path = self.path + ".tmp"
+        if self.format == "parquet":
+            frame.to_parquet(tmp_path, index=False)
+        else:
+            frame.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        self._pending = 0
+
+    def write(self, result: Dict):
+        row = {col: result.get(col) for col in self.columns}
+        self.completed.add(row_key(row["Roll Number"], row["Profile URL"]))
+
+        if self.format == "csv":
+            pd.DataFrame([row], columns=self.columns).to_csv(self.path, mode="a", header=False, index=False)
+        else:
+            self._rows.append(row)
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._rewrite()
+
+    def close(self):
+        if self.format == "parquet" and self._pending:
+            self._rewrite()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_path_for(roster: bytes, level: str, file_format: str = "csv") -> str:
+    """
+    Results path keyed by the roster's contents, so only a re-upload of
+    the very same roster can resume into it
+    """
+    digest = hashlib.sha1(roster).hexdigest()[:10]
+    return os.path.join(EXPORT_DIR, f"agentblazer_{level.lower()}_{digest}.{file_format}")
+
+
+def read_results(path: str) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype={"Roll Number": str})
+
+
+def result_row_count(path: str) -> int:
+    """Rows written to a results file so far, without loading it"""
+    if not os.path.exists(path):
+        return 0
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, "rb") as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+
+def write_progress(path: str, **progress):
+    """Atomically write a small JSON progress file for another process to poll"""
+    progress["updated_at"] = time.time()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, path)
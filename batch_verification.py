@@ -0,0 +1,130 @@
+"""
+Vectorized Agentblazer verification over a DataFrame of scraped profiles.
+
+``verify_agentblazer_badge`` grades one profile dict for one level. Here the
+matched keywords of every profile are encoded once as a boolean matrix
+(profiles x keywords, or a uint64 bitmask per profile for storage), and
+points and keyword thresholds for every level are evaluated in a single
+pass of array operations. Cached profiles can therefore be re-graded
+against edited AGENTBLAZER_REQUIREMENTS without scraping again.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from agentblazer import AGENTBLAZER_REQUIREMENTS
+
+
+def keyword_vocabulary(requirements: Dict = AGENTBLAZER_REQUIREMENTS, field: str = "keywords") -> List[str]:
+    """Union of all level keywords (or ``modules``), deduplicated in definition order"""
+    return list(dict.fromkeys(kw for req in requirements.values() for kw in req[field]))
+
+
+def level_keyword_matrix(
+    vocabulary: Sequence[str],
+    requirements: Dict = AGENTBLAZER_REQUIREMENTS,
+    field: str = "keywords"
+) -> np.ndarray:
+    """(levels x keywords) boolean matrix: which keywords (or modules) count for which level"""
+    matrix = np.zeros((len(requirements), len(vocabulary)), dtype=bool)
+    index = {kw: i for i, kw in enumerate(vocabulary)}
+    for row, req in enumerate(requirements.values()):
+        for kw in set(req[field]):
+            matrix[row, index[kw]] = True
+    return matrix
+
+
+def encode_keywords(keyword_lists: Iterable, vocabulary: Sequence[str]) -> np.ndarray:
+    """(profiles x keywords) boolean matrix from lists of matched keywords"""
+    exploded = pd.Series(list(keyword_lists), dtype=object).explode()
+    matrix = np.zeros((len(exploded.index.unique()), len(vocabulary)), dtype=bool)
+    columns = pd.Index(vocabulary).get_indexer(exploded.to_numpy())
+    known = columns >= 0
+    matrix[exploded.index.to_numpy()[known], columns[known]] = True
+    return matrix
+
+
+def to_bitmasks(matrix: np.ndarray) -> np.ndarray:
+    """Pack a keyword matrix into one uint64 per profile (vocabulary of <= 64)"""
+    if matrix.shape[1] > 64:
+        raise ValueError("Keyword bitmasks support at most 64 keywords")
+    weights = np.left_shift(np.uint64(1), np.arange(matrix.shape[1], dtype=np.uint64))
+    return (matrix.astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+
+
+def from_bitmasks(masks: np.ndarray, n_keywords: int) -> np.ndarray:
+    """Unpack uint64 bitmasks back into a (profiles x keywords) matrix"""
+    bits = np.arange(n_keywords, dtype=np.uint64)
+    return (np.right_shift(np.asarray(masks, dtype=np.uint64)[:, None], bits) & np.uint64(1)).astype(bool)
+
+
+def verify_agentblazer_batch(
+    profiles: pd.DataFrame,
+    requirements: Dict = AGENTBLAZER_REQUIREMENTS,
+    vocabulary: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """
+    Grade every profile against every level at once.
+
+    ``profiles`` needs ``points`` and either ``keywords_found`` (lists) or a
+    ``keyword_mask`` column of bitmasks built with ``to_bitmasks`` over the
+    same ``vocabulary``; ``success`` is honoured when present. Returns one
+    row per profile with ``<Level> Points OK``, ``<Level> Keywords``,
+    ``<Level> Keywords OK`` and ``<Level> Qualified`` columns plus
+    ``Highest Level``, matching ``verify_agentblazer_badge`` per cell. When
+    a ``modules`` column (earned requirement modules) is present,
+    ``<Level> Modules`` counts them per level.
+    """
+    vocabulary = list(vocabulary or keyword_vocabulary(requirements))
+    levels = list(requirements)
+
+    if "keyword_mask" in profiles.columns:
+        keywords = from_bitmasks(profiles["keyword_mask"].to_numpy(), len(vocabulary))
+    else:
+        keywords = encode_keywords(profiles["keywords_found"], vocabulary)
+
+    points = profiles["points"].fillna(0).to_numpy(dtype=np.int64)
+    if "success" in profiles.columns:
+        success = profiles["success"].fillna(False).to_numpy(dtype=bool)
+    else:
+        success = np.ones(len(profiles), dtype=bool)
+
+    min_points = np.array([requirements[level]["min_points"] for level in levels])
+    min_keywords = np.array([requirements[level]["min_keywords"] for level in levels])
+
+    # (profiles x levels) in one pass
+    keyword_counts = keywords.astype(np.int32) @ level_keyword_matrix(vocabulary, requirements).T.astype(np.int32)
+    points_ok = points[:, None] >= min_points[None, :]
+    keywords_ok = keyword_counts >= min_keywords[None, :]
+    qualified = points_ok & keywords_ok & success[:, None]
+
+    module_counts = None
+    if "modules" in profiles.columns:
+        module_vocabulary = keyword_vocabulary(requirements, "modules")
+        modules = encode_keywords(profiles["modules"], module_vocabulary)
+        module_counts = modules.astype(np.int32) @ level_keyword_matrix(
+            module_vocabulary, requirements, "modules"
+        ).T.astype(np.int32)
+
+    graded = {}
+    for column, level in enumerate(levels):
+        graded[f"{level} Points OK"] = points_ok[:, column]
+        graded[f"{level} Keywords"] = keyword_counts[:, column]
+        graded[f"{level} Keywords OK"] = keywords_ok[:, column]
+        if module_counts is not None:
+            graded[f"{level} Modules"] = module_counts[:, column]
+        graded[f"{level} Qualified"] = qualified[:, column]
+
+    # Highest qualifying level in requirement order (levels are listed low to high)
+    highest = np.full(len(profiles), "Not Qualified", dtype=object)
+    for column, level in enumerate(levels):
+        highest[qualified[:, column]] = level
+    graded["Highest Level"] = highest
+
+    return pd.DataFrame(graded, index=profiles.index)
+
+
+def summarize_grades(graded: pd.DataFrame, requirements: Dict = AGENTBLAZER_REQUIREMENTS) -> Dict[str, int]:
+    """Qualified profile count per level"""
+    return {level: int(graded[f"{level} Qualified"].sum()) for level in requirements}
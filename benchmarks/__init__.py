@@ -0,0 +1,3 @@
+"""
+Offline benchmarks against recorded Trailblazer profiles
+"""
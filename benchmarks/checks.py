@@ -0,0 +1,166 @@
+"""
+Offline correctness checks against recorded fixtures.
+
+Each check compares what the scraper's parsers return for a recorded
+input with the expected values stored next to it, so regressions show up
+without network access. Checks that need Chromium (the in-page
+extraction and lazy badge loading) report themselves as skipped when it cannot be launched, or
+fail with ``--require-browser``:
+
+    python -m benchmarks.checks
+"""
+import argparse
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from benchmarks.server import SNAPSHOT_DIR, load_snapshots
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixtures(kind: str) -> Dict[str, Dict]:
+    directory = os.path.join(FIXTURE_DIR, kind)
+    fixtures = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".json"):
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                fixtures[os.path.splitext(filename)[0]] = json.load(f)
+    return fixtures
+
+
+def _mismatches(actual: Dict, expected: Dict) -> List[str]:
+    return [
+        f"{key}: expected {value!r}, got {actual.get(key)!r}"
+        for key, value in expected.items()
+        if actual.get(key) != value
+    ]
+
+
+def check_api_json() -> List[str]:
+    """parse_profile_json on the recorded API payloads in fixtures/api"""
+    from api_capture import parse_profile_json
+
+    failures = []
+    for name, fixture in load_fixtures("api").items():
+        parsed = parse_profile_json(fixture["payloads"])
+        failures += [f"api/{name}: {problem}" for problem in _mismatches(parsed, fixture["expected"])]
+    return failures
+
+
+def check_endpoint_templates() -> List[str]:
+    """template_request on the recorded requests in fixtures/endpoints"""
+    from api_capture import template_request
+
+    failures = []
+    for name, fixture in load_fixtures("endpoints").items():
+        template = template_request(fixture["request"], fixture["slug"])
+        if template != fixture["expected"]:
+            failures.append(f"endpoints/{name}: expected {fixture['expected']!r}, got {template!r}")
+    return failures
+
+
+class CheckSkipped(Exception):
+    """A check whose prerequisites (e.g. Chromium) are missing here"""
+
+
+@contextmanager
+def snapshot_pages() -> Iterator[Iterator[Tuple[str, object]]]:
+    """(name, page) for every recorded snapshot, rendered offline in Chromium"""
+    from playwright.sync_api import sync_playwright
+
+    from browser_pool import BROWSER_LAUNCH_ARGS
+
+    with sync_playwright() as p:
+        try:
+            browser = p.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+        except Exception as e:
+            raise CheckSkipped(f"Chromium could not be launched: {str(e).splitlines()[0]}")
+
+        def pages():
+            for name, body in load_snapshots(SNAPSHOT_DIR).items():
+                page = browser.new_page()
+                page.route("**/*", lambda route: route.abort())
+                page.set_content(body.decode("utf-8"))
+                try:
+                    yield name, page
+                finally:
+                    page.close()
+
+        try:
+            yield pages()
+        finally:
+            browser.close()
+
+
+def check_page_extraction() -> List[str]:
+    """In-page ``extract_page`` agrees with ``extraction.extract`` on every snapshot"""
+    from extraction import extract
+    from page_extraction import extract_page
+
+    failures = []
+    with snapshot_pages() as pages:
+        for name, page in pages:
+            reference = extract(page.inner_text("body").lower())
+            in_page = extract_page(page)
+            for field in ("points", "badges", "rank", "keywords_found"):
+                if in_page[field] != reference[field]:
+                    failures.append(
+                        f"snapshots/{name}: {field} is {in_page[field]!r} in page, {reference[field]!r} in Python"
+                    )
+    return failures
+
+
+def check_badge_pagination() -> List[str]:
+    """Lazy badge loading on the snapshots in fixtures/pages matches the expected modules and stop"""
+    from page_extraction import extract_page_until
+    from scraper import build_profile_data, levels_decided_for
+
+    expectations = load_fixtures("pages")
+    failures = []
+    with snapshot_pages() as pages:
+        for name, page in pages:
+            if name not in expectations:
+                continue
+            profile_data = build_profile_data(extract_page_until(page, levels_decided_for), name)
+            failures += [f"pages/{name}: {problem}" for problem in _mismatches(profile_data, expectations[name]["expected"])]
+    missing = set(expectations) - set(load_snapshots(SNAPSHOT_DIR))
+    failures += [f"pages/{name}: no snapshots/{name}.html" for name in sorted(missing)]
+    return failures
+
+
+CHECKS: Dict[str, Callable[[], List[str]]] = {
+    "api_json": check_api_json,
+    "endpoint_templates": check_endpoint_templates,
+    "page_extraction": check_page_extraction,
+    "badge_pagination": check_badge_pagination
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline correctness checks")
+    parser.add_argument("--checks", default=",".join(CHECKS), help=f"comma-separated subset of {', '.join(CHECKS)}")
+    parser.add_argument("--require-browser", action="store_true", help="fail instead of skipping browser checks")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name in [c for c in args.checks.split(",") if c]:
+        try:
+            failures = CHECKS[name]()
+        except CheckSkipped as e:
+            print(f"- {name} skipped: {e}", file=sys.stderr)
+            failed = failed or args.require_browser
+            continue
+        for failure in failures:
+            print(f"✗ {failure}", file=sys.stderr)
+        if failures:
+            failed = True
+        else:
+            print(f"✓ {name}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Offline benchmark harness for the scraper.
+
+Serves the recorded snapshots from a local ``ProfileServer`` and drives the
+extraction engine, ``verify_agentblazer_badge``, ``scrape_salesforce_profile``
+(pooled browser) and the async batch path through it. Reports
+profiles/sec, p50/p95/p99 latency, per-stage scrape timings and, when
+``psutil`` is installed (``pip install -r benchmarks/requirements.txt``),
+browser memory and CPU as JSON so runs can be compared between releases:
+
+    python -m benchmarks.run --profiles 30 --concurrency 4 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.server import ProfileServer
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - resource sampling is optional
+    psutil = None
+
+SCENARIOS = ("extract", "verify", "scrape", "batch")
+PROFILE_KINDS = ("small", "large", "malformed", "paginated")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(latencies_ms: List[float], wall_seconds: float) -> Dict:
+    return {
+        "count": len(latencies_ms),
+        "wall_seconds": round(wall_seconds, 3),
+        "profiles_per_sec": round(len(latencies_ms) / wall_seconds, 3) if wall_seconds else 0.0,
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else 0.0,
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+        "max_ms": round(max(latencies_ms), 3) if latencies_ms else 0.0
+    }
+
+
+class ResourceSampler:
+    """
+    Samples RSS and CPU time of this process's descendants (the browsers)
+    and traces peak Python allocations of the scraping process itself
+    """
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak_rss = 0
+        self.samples: List[int] = []
+        self._cpu_start: Dict[int, float] = {}
+        self._cpu: Dict[int, float] = {}
+        self.python_peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        rss = 0
+        for child in psutil.Process().children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+                times = child.cpu_times()
+                self._cpu[child.pid] = times.user + times.system
+                self._cpu_start.setdefault(child.pid, self._cpu[child.pid])
+            except psutil.Error:
+                continue
+        self.samples.append(rss)
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "ResourceSampler":
+        tracemalloc.start()
+        if psutil is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.python_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    def report(self, wall_seconds: float, in_flight: int = 1) -> Dict:
+        python = {
+            "python_peak_alloc_mb": round(self.python_peak / 2 ** 20, 2),
+            "python_alloc_per_in_flight_kb": round(self.python_peak / 1024 / max(1, in_flight), 1)
+        }
+        if psutil is None:
+            return {"available": False, **python}
+        cpu_seconds = sum(self._cpu[pid] - self._cpu_start[pid] for pid in self._cpu)
+        mean_rss = sum(self.samples) / len(self.samples) if self.samples else 0
+        return {
+            "available": True,
+            **python,
+            "browser_peak_rss_mb": round(self.peak_rss / 2 ** 20, 1),
+            "browser_mean_rss_mb": round(mean_rss / 2 ** 20, 1),
+            "browser_rss_per_in_flight_mb": round(self.peak_rss / 2 ** 20 / max(1, in_flight), 1),
+            "browser_cpu_seconds": round(cpu_seconds, 2),
+            "browser_cpu_percent": round(100 * cpu_seconds / wall_seconds, 1) if wall_seconds else 0.0
+        }
+
+
+def timed(fn: Callable, iterations: int) -> List[float]:
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def bench_extract(server: ProfileServer, iterations: int) -> Dict:
+    from extraction import extract, html_to_text
+
+    results = {}
+    for name, body in server.snapshots.items():
+        text = html_to_text(body.decode("utf-8"))
+        started = time.perf_counter()
+        latencies = timed(lambda: extract(text), iterations)
+        results[name] = {"text_chars": len(text), **summarize(latencies, time.perf_counter() - started)}
+    return results
+
+
+def bench_verify(server: ProfileServer, iterations: int) -> Dict:
+    from agentblazer import AGENTBLAZER_REQUIREMENTS, verify_agentblazer_badge
+    from extraction import html_to_text
+    from scraper import extract_profile_data
+
+    profiles = [
+        extract_profile_data(html_to_text(body.decode("utf-8")), server.profile_url(name))
+        for name, body in server.snapshots.items()
+    ]
+
+    def verify_all():
+        for profile_data in profiles:
+            for level in AGENTBLAZER_REQUIREMENTS:
+                verify_agentblazer_badge(profile_data, level)
+
+    started = time.perf_counter()
+    latencies = timed(verify_all, iterations)
+    checks = len(profiles) * len(AGENTBLAZER_REQUIREMENTS)
+    return {"checks_per_iteration": checks, **summarize(latencies, time.perf_counter() - started)}
+
+
+def bench_scrape(server: ProfileServer, urls: List[str]) -> Dict:
+    from browser_pool import get_browser_pool
+    from scraper import scrape_salesforce_profile
+
+    pool = get_browser_pool()
+
+    # The first scrape pays for launching the pool's browser
+    started = time.perf_counter()
+    warmup = scrape_salesforce_profile(server.profile_url("small-warmup"))
+    cold_start_ms = (time.perf_counter() - started) * 1000
+
+    latencies, failures, ready_paths = [], 0, {}
+    with ResourceSampler() as sampler:
+        started = time.perf_counter()
+        for url in urls:
+            t0 = time.perf_counter()
+            profile_data = scrape_salesforce_profile(url)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            failures += not profile_data.get("success", False)
+            path = str(profile_data.get("ready_via", "n/a")).split(":")[0]
+            ready_paths[path] = ready_paths.get(path, 0) + 1
+        wall = time.perf_counter() - started
+
+    return {
+        "cold_start_ms": round(cold_start_ms, 1),
+        "warmup_success": warmup.get("success", False),
+        "failures": failures,
+        "ready_paths": ready_paths,
+        "pool_size": pool.size,
+        **summarize(latencies, wall),
+        "resources": sampler.report(wall, in_flight=1)
+    }
+
+
+def bench_batch(server: ProfileServer, urls: List[str], concurrency: int) -> Dict:
+    from batch_engine import run_batch
+
+    rows = [
+        {"Roll Number": i, "Name": url.rsplit("/", 1)[-1], "Salesforce URL": url}
+        for i, url in enumerate(urls)
+    ]
+    completions: List[float] = []
+    started = time.perf_counter()
+
+    def on_result(index, result, completed, total):
+        completions.append((time.perf_counter() - started) * 1000)
+
+    with ResourceSampler() as sampler:
+        results = run_batch(
+            rows,
+            "Champion",
+            concurrency=concurrency,
+            requests_per_second=0,
+            on_result=on_result
+        )
+        wall = time.perf_counter() - started
+
+    summary = summarize(completions, wall)
+    # Batch rows are not individually timed; percentiles are completion times
+    for key in ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"):
+        summary[key.replace("_ms", "_completion_ms")] = summary.pop(key)
+    return {
+        "concurrency": concurrency,
+        "failures": sum(1 for row in results if row["Badge Awarded"] == "Error"),
+        **summary,
+        "resources": sampler.report(wall, in_flight=concurrency)
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"comma-separated subset of {', '.join(SCENARIOS)}")
+    parser.add_argument("--kinds", default=",".join(PROFILE_KINDS),
+                        help=f"snapshot kinds to request ({', '.join(PROFILE_KINDS)})")
+    parser.add_argument("--profiles", type=int, default=12, help="profiles per scrape/batch run")
+    parser.add_argument("--iterations", type=int, default=200, help="iterations for extract/verify")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="injected server latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    kinds = [k for k in args.kinds.split(",") if k]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args)
+        },
+        "scenarios": {}
+    }
+
+    with ProfileServer(args.latency_ms, args.jitter_ms) as server:
+        urls = [server.profile_url(f"{kinds[i % len(kinds)]}-{i}") for i in range(args.profiles)]
+        for scenario in scenarios:
+            if scenario == "extract":
+                result = bench_extract(server, args.iterations)
+            elif scenario == "verify":
+                result = bench_verify(server, args.iterations)
+            elif scenario == "scrape":
+                result = bench_scrape(server, urls)
+            else:
+                result = bench_batch(server, urls, args.concurrency)
+            report["scenarios"][scenario] = result
+            print(f"✓ {scenario}", file=sys.stderr)
+
+    # Per-stage breakdown of every scrape above (see metrics.StageTimings)
+    from metrics import get_metrics
+    report["stages"] = get_metrics().snapshot()["stages"]
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return report
+
+
+if __name__ == "__main__":
+    main()
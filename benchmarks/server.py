@@ -0,0 +1,115 @@
+"""
+Local stand-in for www.salesforce.com serving recorded Trailblazer profiles.
+
+``/trailblazer/<slug>`` returns the snapshot whose name prefixes the slug
+(``small-01`` -> snapshots/small.html, ``large-7`` -> large.html, ...), so a
+benchmark can request many distinct profile URLs backed by a few
+recordings. Static assets referenced by the snapshots are answered with
+small placeholder bodies. Optional latency (plus jitter) is added before
+every response.
+"""
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+
+
+def load_snapshots(directory: str = SNAPSHOT_DIR) -> Dict[str, bytes]:
+    snapshots = {}
+    for filename in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(filename)
+        if ext in (".html", ".htm"):
+            with open(os.path.join(directory, filename), "rb") as f:
+                snapshots[name] = f.read()
+    return snapshots
+
+
+class ProfileServer:
+    """Threaded HTTP server with injectable latency, run in a background thread"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, port: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.snapshots = load_snapshots()
+        self.requests_served = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._delay()
+                server.requests_served += 1
+                path = urlparse(self.path).path
+                status, content_type, body = server.resolve(path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def profile_url(self, slug: str) -> str:
+        return f"{self.base_url}/trailblazer/{slug}"
+
+    def _delay(self):
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def resolve(self, path: str):
+        if path.startswith("/trailblazer/"):
+            slug = path.rsplit("/", 1)[-1]
+            for name, body in self.snapshots.items():
+                if slug.startswith(name):
+                    return 200, "text/html; charset=utf-8", body
+            return 404, "text/html; charset=utf-8", b"<html><body>Profile not found</body></html>"
+        if path.endswith(".css"):
+            return 200, "text/css", b"body{font-family:sans-serif}" * 200
+        if path.endswith(".png"):
+            return 200, "image/png", b"\x89PNG\r\n\x1a\n" + b"\x00" * 4096
+        return 404, "text/plain", b"not found"
+
+    def start(self) -> "ProfileServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="profile-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "ProfileServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve recorded Trailblazer profiles locally")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    profile_server = ProfileServer(args.latency_ms, args.jitter_ms, args.port)
+    print(f"Serving {', '.join(profile_server.snapshots)} at {profile_server.base_url}/trailblazer/<name>-<n>")
+    profile_server.httpd.serve_forever()
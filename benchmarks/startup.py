@@ -0,0 +1,79 @@
+"""
+Import-time budget check for the Streamlit app.
+
+Imports ``app`` in fresh interpreters (after ``streamlit`` itself, whose
+cost is not ours) and fails when the median import time exceeds the budget
+or when a heavy module such as pandas or Playwright was loaded eagerly.
+Meant for CI next to the benchmarks:
+
+    python -m benchmarks.startup --runs 5 --budget-ms 150
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+STARTUP_BUDGET_MS = float(os.environ.get("APP_STARTUP_BUDGET_MS", "150"))
+
+# Must only be imported once a scrape, batch or re-grade starts
+DEFERRED_MODULES = ("pandas", "numpy", "playwright", "requests", "ahocorasick")
+
+_PROBE = """
+import json, sys, time
+import streamlit
+started = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{"import_ms": elapsed_ms, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module: str = "app") -> Dict:
+    """Import ``module`` in a fresh interpreter; returns import_ms and the deferred modules it loaded"""
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, deferred=DEFERRED_MODULES)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the app's cold import time")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    # The first run warms the OS file cache and writes bytecode
+    measure_import(args.module)
+    samples = [measure_import(args.module) for _ in range(max(1, args.runs))]
+    median_ms = statistics.median(sample["import_ms"] for sample in samples)
+    loaded = sorted({module for sample in samples for module in sample["loaded"]})
+
+    print(json.dumps({
+        "module": args.module,
+        "median_import_ms": round(median_ms, 1),
+        "max_import_ms": round(max(sample["import_ms"] for sample in samples), 1),
+        "budget_ms": args.budget_ms,
+        "eager_heavy_modules": loaded
+    }, indent=2))
+
+    failed = False
+    if median_ms > args.budget_ms:
+        print(f"✗ import {args.module} took {median_ms:.0f}ms (budget {args.budget_ms:.0f}ms)", file=sys.stderr)
+        failed = True
+    if loaded:
+        print(f"✗ import {args.module} loaded {', '.join(loaded)} eagerly", file=sys.stderr)
+        failed = True
+    if not failed:
+        print(f"✓ import {args.module} in {median_ms:.0f}ms", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
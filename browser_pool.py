@@ -0,0 +1,286 @@
+"""
+Process-wide pool of warm Chromium browsers for profile scraping.
+
+Each pool slot is a worker thread that owns its own ``sync_playwright``
+instance and Chromium browser (sync Playwright objects are bound to the
+thread that created them). Jobs are callables that receive a fresh,
+isolated ``BrowserContext``; the context is closed after every job while
+the browser stays up until it has served ``max_pages_per_browser`` jobs or
+is found disconnected. A slot whose Playwright driver fails to start
+stops taking jobs and is restarted on the next submit; queued jobs only
+fail when no slot is left alive.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from playwright.sync_api import sync_playwright
+
+from metrics import STAGE_METRIC, get_metrics
+
+BROWSER_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-web-security'
+]
+
+DEFAULT_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "2"))
+DEFAULT_MAX_PAGES_PER_BROWSER = int(os.environ.get("BROWSER_MAX_PAGES", "50"))
+
+_STOP = object()
+
+
+class _BrowserWorker(threading.Thread):
+    """Pool slot: one thread, one Playwright driver, one (restartable) browser"""
+
+    def __init__(self, pool: "BrowserPool", slot: int):
+        super().__init__(name=f"browser-pool-{slot}", daemon=True)
+        self.pool = pool
+        self.slot = slot
+        self.browser = None
+        self.pages_served = 0
+        self.total_pages = 0
+        self.launches = 0
+        self.crashes = 0
+        self.busy = False
+        self.dead = False
+        self.last_error = ""
+
+    def run(self):
+        try:
+            with sync_playwright() as p:
+                self._serve(p)
+        except BaseException as e:
+            # The Playwright driver itself failed: stop taking jobs so the
+            # healthy slots get them; the slot is restarted on the next submit
+            self.last_error = str(e)
+            self.pool._worker_died(self, e)
+
+    def _serve(self, p):
+        while True:
+            job = self.pool._jobs.get()
+            if job is _STOP:
+                break
+
+            future, fn = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            self.busy = True
+            try:
+                browser = self._ensure_browser(p)
+                context = browser.new_context(**self.pool.context_options)
+                try:
+                    result = fn(context)
+                finally:
+                    context.close()
+                future.set_result(result)
+            except BaseException as e:
+                self.last_error = str(e)
+                future.set_exception(e)
+            finally:
+                self.busy = False
+                self.pages_served += 1
+                self.total_pages += 1
+
+            # Recycle browsers that have served their quota
+            if self.pages_served >= self.pool.max_pages_per_browser:
+                self._close_browser()
+
+        self._close_browser()
+
+    def _ensure_browser(self, p):
+        """Health check: relaunch the browser if it is missing or has crashed"""
+        if self.browser is not None and not self.is_healthy():
+            self.crashes += 1
+            self._close_browser()
+
+        if self.browser is None:
+            started = time.perf_counter()
+            self.browser = p.chromium.launch(
+                headless=True,
+                args=self.pool.launch_args
+            )
+            get_metrics().observe(STAGE_METRIC, time.perf_counter() - started, stage="browser_launch")
+            self.pages_served = 0
+            self.launches += 1
+
+        return self.browser
+
+    def _close_browser(self):
+        if self.browser is None:
+            return
+        try:
+            self.browser.close()
+        except Exception:
+            pass
+        self.browser = None
+
+    def is_healthy(self) -> bool:
+        try:
+            return self.browser is not None and self.browser.is_connected()
+        except Exception:
+            return False
+
+    def status(self) -> Dict:
+        return {
+            "slot": self.slot,
+            "alive": self.is_alive() and not self.dead,
+            "browser_running": self.browser is not None,
+            "busy": self.busy,
+            "pages_served": self.pages_served,
+            "total_pages": self.total_pages,
+            "launches": self.launches,
+            "crashes": self.crashes,
+            "last_error": self.last_error
+        }
+
+
+class BrowserPool:
+    """Fixed-size pool of warm Chromium browsers serving isolated contexts"""
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        max_pages_per_browser: int = DEFAULT_MAX_PAGES_PER_BROWSER,
+        launch_args: Optional[List[str]] = None,
+        context_options: Optional[Dict] = None
+    ):
+        if size < 1:
+            raise ValueError("Browser pool size must be at least 1")
+
+        self.size = size
+        self.max_pages_per_browser = max(1, max_pages_per_browser)
+        self.launch_args = launch_args or BROWSER_LAUNCH_ARGS
+        self.context_options = context_options or {}
+        self.started_at = time.time()
+
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._live = size
+        self._workers = [_BrowserWorker(self, slot) for slot in range(size)]
+        for worker in self._workers:
+            worker.start()
+
+    def _worker_died(self, worker: _BrowserWorker, error: BaseException):
+        with self._lock:
+            worker.dead = True
+            self._live -= 1
+            if self._live > 0 or self._closed:
+                return
+            # No slot left to run queued work: fail it rather than leave callers hanging
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not _STOP and job[0].set_running_or_notify_cancel():
+                    job[0].set_exception(error)
+
+    def _restart_dead_workers(self):
+        """Replace slots whose Playwright driver failed (caller holds the lock)"""
+        for slot, worker in enumerate(self._workers):
+            if worker.dead:
+                replacement = _BrowserWorker(self, slot)
+                self._workers[slot] = replacement
+                self._live += 1
+                replacement.start()
+
+    def restart_dead_workers(self) -> int:
+        """Restart dead slots; returns how many slots are alive afterwards"""
+        with self._lock:
+            if not self._closed:
+                self._restart_dead_workers()
+            return self.alive_workers()
+
+    def submit(self, fn: Callable[[Any], Any]) -> Future:
+        """Queue ``fn(context)`` on the next free browser"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Browser pool has been shut down")
+            if self._live < self.size:
+                self._restart_dead_workers()
+            future: Future = Future()
+            self._jobs.put((future, fn))
+        return future
+
+    def run(self, fn: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """Run ``fn(context)`` on a pooled browser and wait for its result"""
+        return self.submit(fn).result(timeout=timeout)
+
+    def queue_depth(self) -> int:
+        return self._jobs.qsize()
+
+    def busy_workers(self) -> int:
+        return sum(worker.busy for worker in self._workers)
+
+    def alive_workers(self) -> int:
+        return sum(worker.is_alive() and not worker.dead for worker in self._workers)
+
+    def health(self) -> List[Dict]:
+        return [worker.status() for worker in self._workers]
+
+    def shutdown(self, wait: bool = True, timeout: float = 10.0):
+        """Stop all workers and close their browsers"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+            # Drop queued work so shutdown is not blocked behind a long batch
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not _STOP:
+                    job[0].cancel()
+
+            for _ in self._workers:
+                self._jobs.put(_STOP)
+
+        if wait:
+            for worker in self._workers:
+                worker.join(timeout=timeout)
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide browser pool, starting it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and not _pool._closed and _pool.alive_workers() < _pool.size:
+            _pool.restart_dead_workers()
+        if _pool is None or _pool._closed:
+            _pool = BrowserPool()
+            metrics = get_metrics()
+            metrics.register_gauge("scraper_browser_pool_size", "Browsers in the pool", lambda: _pool.size)
+            metrics.register_gauge("scraper_browser_pool_busy", "Pool browsers running a scrape", _pool.busy_workers)
+            metrics.register_gauge(
+                "scraper_browser_pool_alive", "Pool slots with a running Playwright driver", _pool.alive_workers
+            )
+            metrics.register_gauge(
+                "scraper_browser_pool_queue_depth", "Scrapes waiting for a pooled browser", _pool.queue_depth
+            )
+        return _pool
+
+
+def shutdown_browser_pool():
+    """Shut down the process-wide pool (registered as an exit hook)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+atexit.register(shutdown_browser_pool)
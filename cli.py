@@ -0,0 +1,367 @@
+"""
+Headless command-line entry point, independent of the Streamlit UI.
+
+    python -m cli scrape https://www.salesforce.com/trailblazer/<id> --level Champion
+    python -m cli batch roster.csv --level Champion --concurrency 8 --output data/results.csv
+    python -m cli batch roster.csv --output data/results.parquet --resume
+    python -m cli worker --concurrency 4
+    python -m cli sharded roster.csv --shards 4 --output data/results.csv
+
+Batch results are appended to the output file as each profile is scored
+and a ``<output>.progress.json`` file is kept up to date, so a run can be
+watched from another process and resumed after an interruption.
+``worker`` processes jobs submitted to the shared ``job_queue`` instead;
+``sharded`` splits a roster across local processes (see ``sharding``).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from agentblazer import AGENTBLAZER_REQUIREMENTS, verify_agentblazer_badge
+from batch_engine import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_REQUESTS_PER_SECOND,
+    BatchBrowser,
+    build_batch_row,
+    run_batch_async,
+    run_batches
+)
+from batch_io import RESULT_COLUMNS, ROSTER_CHUNK_ROWS, ResultWriter, RosterReader, row_key, write_progress
+from job_queue import HEARTBEAT_SECONDS, JobQueue, new_worker_id
+from metrics import METRICS_PORT, get_metrics, start_metrics_server
+from profile_cache import ProfileCache, get_profile_cache
+from profile_urls import ProfileIndex, normalize_profile_url
+from retry_policy import ERROR_CODES, classify_error
+from scraper import failed_profile_data, scrape_with_cache
+from sharding import (
+    ROSTER_ROW_COLUMN,
+    SHARD_RESULT_COLUMNS,
+    merge_shard_outputs,
+    parse_shard,
+    run_local_shards,
+    shard_cache_path,
+    shard_for
+)
+
+
+def progress_path(output: str) -> str:
+    return output + ".progress.json"
+
+
+def cmd_scrape(args) -> int:
+    profile_data = scrape_with_cache(args.url, refresh=args.refresh)
+    verification = verify_agentblazer_badge(profile_data, args.level)
+    print(json.dumps(verification, indent=2, default=str))
+    return 0 if profile_data.get("success", False) else 1
+
+
+def cmd_batch(args) -> int:
+    try:
+        shard, shards = parse_shard(args.shard) if args.shard else (0, 1)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    roster = RosterReader(args.input, chunksize=args.chunk_size, limit=args.limit)
+    profile_index = ProfileIndex()
+    status_path = progress_path(args.output)
+
+    # A shard only scores its own profiles, with its own cache partition
+    cache = ProfileCache(shard_cache_path(shard)) if args.shard else get_profile_cache()
+    columns = SHARD_RESULT_COLUMNS if args.shard else RESULT_COLUMNS
+
+    with ResultWriter(args.output, resume=args.resume, retry_failed=args.retry_failed, columns=columns) as writer:
+        started_at = time.time()
+        completed = skipped = failed = 0
+        roster_rows = 0
+        ordinals: List[int] = []
+
+        def report(status: str):
+            write_progress(
+                status_path,
+                status=status,
+                input=args.input,
+                output=args.output,
+                level=args.level,
+                shard=args.shard,
+                rows_read=roster.valid,
+                completed=skipped + completed,
+                failed=failed,
+                invalid=roster.invalid,
+                duplicates=roster.duplicates,
+                unique_profiles=profile_index.profiles,
+                scrapes_saved=profile_index.scrapes_saved,
+                started_at=started_at
+            )
+
+        def on_result(index, result, chunk_completed, chunk_total):
+            nonlocal completed, failed
+            if args.shard:
+                result = {**result, ROSTER_ROW_COLUMN: ordinals[index]}
+            writer.write(result)
+            completed += 1
+            failed += result["Badge Awarded"] == "Error"
+            report("running")
+            if not args.quiet:
+                print(f"[{skipped + completed}/{roster.valid}+] {result['Name']}: {result['Status']}", file=sys.stderr)
+
+        # Only one chunk of the roster is in memory at a time
+        def pending_chunks():
+            nonlocal roster_rows, skipped, ordinals
+            for chunk in roster:
+                mine = [
+                    (roster_rows + position, row) for position, row in enumerate(chunk)
+                    if shards == 1 or shard_for(normalize_profile_url(row["Salesforce URL"]), shards) == shard
+                ]
+                roster_rows += len(chunk)
+                pending = [
+                    (ordinal, row) for ordinal, row in mine
+                    if row_key(row["Roll Number"], row["Salesforce URL"]) not in writer.completed
+                ]
+                skipped += len(mine) - len(pending)
+                ordinals = [ordinal for ordinal, _ in pending]
+                yield [row for _, row in pending]
+
+        report("running")
+        try:
+            # One browser for the whole run; browser failures come back as failed rows
+            run_batches(
+                pending_chunks(),
+                args.level,
+                concurrency=args.concurrency,
+                requests_per_second=args.rate,
+                on_result=on_result,
+                cache=cache,
+                refresh_stale_only=not args.refresh,
+                index=profile_index
+            )
+        except KeyboardInterrupt:
+            report("interrupted")
+            return 130
+        except ValueError as e:
+            report("failed")
+            print(e, file=sys.stderr)
+            return 2
+        except Exception as e:
+            report("failed")
+            print(f"Batch failed: {e}", file=sys.stderr)
+            return 1
+
+        report("finished")
+
+    print(
+        f"Wrote {skipped + completed} results to {args.output} ({failed} failed; "
+        f"skipped {roster.invalid} invalid and {roster.duplicates} duplicate rows; "
+        f"{profile_index.scrapes_saved} scrapes saved by profile deduplication)",
+        file=sys.stderr
+    )
+    return 0
+
+
+def cmd_sharded(args) -> int:
+    batch_args = [
+        args.input,
+        "--level", args.level,
+        "--concurrency", str(args.concurrency),
+        # The per-host limit applies per process, so split it between shards
+        "--rate", str(args.rate / args.shards),
+        "--chunk-size", str(args.chunk_size)
+    ]
+    if args.limit:
+        batch_args += ["--limit", str(args.limit)]
+    for flag in ("resume", "retry_failed", "refresh"):
+        if getattr(args, flag):
+            batch_args.append("--" + flag.replace("_", "-"))
+
+    started = time.time()
+    try:
+        codes = run_local_shards(args.shards, batch_args, args.output, quiet=args.quiet)
+    except KeyboardInterrupt:
+        return 130
+    rows = merge_shard_outputs(args.output, args.shards)
+    failed_shards = [shard for shard, code in enumerate(codes) if code != 0]
+    print(
+        f"Merged {rows} results from {args.shards} shards into {args.output} in {time.time() - started:.1f}s"
+        + (f"; shards {failed_shards} failed (partial results)" if failed_shards else ""),
+        file=sys.stderr
+    )
+    return 1 if failed_shards else 0
+
+
+def cmd_merge(args) -> int:
+    rows = merge_shard_outputs(args.output, args.shards)
+    print(f"Merged {rows} results from {args.shards} shards into {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_worker(args) -> int:
+    queue = JobQueue()
+    cache = get_profile_cache()
+    get_metrics().register_gauge("scraper_job_queue_depth", "Queued profiles waiting for a worker", queue.depth)
+    if start_metrics_server(args.metrics_port):
+        print(f"Serving metrics on :{args.metrics_port}/metrics", file=sys.stderr)
+    worker_id = new_worker_id()
+    claim_size = args.claim or args.concurrency * 4
+    state = {"busy": False, "processed": 0}
+    stopped = threading.Event()
+    print(f"Worker {worker_id} polling {queue.path}", file=sys.stderr)
+
+    def keep_alive():
+        # A claim round can outlast the worker timeout and the lease (backoff,
+        # breaker cooldown), so heartbeat and renew leases from a timer
+        while not stopped.wait(HEARTBEAT_SECONDS):
+            try:
+                queue.heartbeat(worker_id, busy=state["busy"], processed=state["processed"])
+                queue.renew_leases(worker_id)
+            except sqlite3.Error as e:
+                print(f"Heartbeat failed: {e}", file=sys.stderr)
+
+    def lost_lease(item):
+        # Another worker took the item over after our lease expired; its result stands
+        print(f"Lease lost for {item['job_id']}#{item['idx']}; result discarded", file=sys.stderr)
+
+    async def work():
+        # One driver and browser for the worker's lifetime, relaunched only
+        # if it crashes, instead of a fresh Chromium every claim round
+        async with BatchBrowser() as browsers:
+            while True:
+                state["busy"] = False
+                queue.heartbeat(worker_id, busy=False, processed=state["processed"])
+                items = queue.claim(worker_id, limit=claim_size)
+                if not items:
+                    if args.once:
+                        break
+                    await asyncio.sleep(args.poll)
+                    continue
+
+                state["busy"] = True
+                queue.heartbeat(worker_id, busy=True, processed=state["processed"])
+
+                # Items from different jobs may target different levels; retries skip the cache
+                groups: Dict = {}
+                for item in items:
+                    refresh = item["options"].get("refresh", False) or item["attempt"] > 1
+                    groups.setdefault((item["level"], refresh), []).append(item)
+
+                for (level, refresh), group in groups.items():
+                    finished = set()
+
+                    def on_result(index, result, completed, total):
+                        item = group[index]
+                        error = result["Error Code"] or None
+                        # Permanent errors (e.g. not_found) are not worth another queue round
+                        attempts = {} if ERROR_CODES.get(error, True) else {"max_attempts": 0}
+                        if not queue.complete(item["job_id"], item["idx"], worker_id, result, error=error, **attempts):
+                            lost_lease(item)
+                        finished.add(index)
+
+                    try:
+                        await run_batch_async(
+                            [item["row"] for item in group],
+                            level,
+                            concurrency=args.concurrency,
+                            requests_per_second=args.rate,
+                            on_result=on_result,
+                            cache=cache,
+                            refresh_stale_only=not refresh,
+                            browser=await browsers.get()
+                        )
+                    except Exception as e:
+                        # Browser-level failure: fail (or re-queue) whatever did not finish
+                        for index, item in enumerate(group):
+                            if index not in finished:
+                                error = classify_error(e)
+                                profile_data = failed_profile_data(item["row"]["Salesforce URL"], str(error), error.code)
+                                result = build_batch_row(item["row"], level, profile_data)
+                                if not queue.complete(item["job_id"], item["idx"], worker_id, result, error=error.code):
+                                    lost_lease(item)
+
+                state["processed"] += len(items)
+                if not args.quiet:
+                    print(f"Processed {state['processed']} items (queue depth {queue.depth()})", file=sys.stderr)
+
+    threading.Thread(target=keep_alive, name="worker-heartbeat", daemon=True).start()
+    try:
+        asyncio.run(work())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        queue.unregister(worker_id)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Agentblazer badge verification")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    scrape = subcommands.add_parser("scrape", help="verify a single profile and print JSON")
+    scrape.add_argument("url")
+    scrape.add_argument("--level", choices=list(AGENTBLAZER_REQUIREMENTS), default="Champion")
+    scrape.add_argument("--refresh", action="store_true", help="ignore the profile cache")
+    scrape.set_defaults(func=cmd_scrape)
+
+    batch = subcommands.add_parser("batch", help="verify every row of a roster CSV")
+    batch.add_argument("input", help="CSV with Roll Number, Name and Salesforce URL columns")
+    batch.add_argument("--level", choices=list(AGENTBLAZER_REQUIREMENTS), default="Champion")
+    batch.add_argument("--output", default="data/batch_results.csv", help=".csv or .parquet")
+    batch.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    batch.add_argument("--rate", type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                       help="max requests per second per host")
+    batch.add_argument("--limit", type=int, help="only the first N valid roster rows")
+    batch.add_argument("--chunk-size", type=int, default=ROSTER_CHUNK_ROWS, help="roster rows read at a time")
+    batch.add_argument("--resume", action="store_true", help="skip rows already in --output")
+    batch.add_argument("--retry-failed", action="store_true", help="with --resume, re-run rows that errored")
+    batch.add_argument("--refresh", action="store_true", help="re-scrape even if the cache is fresh")
+    batch.add_argument("--shard", help="I/N: only score shard I of N (rows split by profile hash)")
+    batch.add_argument("--quiet", action="store_true")
+    batch.set_defaults(func=cmd_batch)
+
+    sharded = subcommands.add_parser("sharded", help="run a roster as N local shard processes and merge")
+    sharded.add_argument("input", help="CSV with Roll Number, Name and Salesforce URL columns")
+    sharded.add_argument("--shards", type=int, default=os.cpu_count() or 2)
+    sharded.add_argument("--level", choices=list(AGENTBLAZER_REQUIREMENTS), default="Champion")
+    sharded.add_argument("--output", default="data/batch_results.csv", help=".csv or .parquet")
+    sharded.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="pages in flight per shard")
+    sharded.add_argument("--rate", type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                         help="max requests per second per host, across all shards")
+    sharded.add_argument("--limit", type=int, help="only the first N valid roster rows")
+    sharded.add_argument("--chunk-size", type=int, default=ROSTER_CHUNK_ROWS, help="roster rows read at a time")
+    sharded.add_argument("--resume", action="store_true", help="skip rows already in the shard outputs")
+    sharded.add_argument("--retry-failed", action="store_true", help="with --resume, re-run rows that errored")
+    sharded.add_argument("--refresh", action="store_true", help="re-scrape even if the cache is fresh")
+    sharded.add_argument("--quiet", action="store_true")
+    sharded.set_defaults(func=cmd_sharded)
+
+    merge = subcommands.add_parser("merge", help="merge shard outputs (e.g. from several containers) in roster order")
+    merge.add_argument("output", help="the --output the shards were given")
+    merge.add_argument("--shards", type=int, required=True)
+    merge.set_defaults(func=cmd_merge)
+
+    worker = subcommands.add_parser("worker", help="process batch jobs from the shared job queue")
+    worker.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    worker.add_argument("--rate", type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help="max requests per second per host")
+    worker.add_argument("--claim", type=int, help="items leased per round (default 4x concurrency)")
+    worker.add_argument("--poll", type=float, default=2.0, help="seconds between polls when idle")
+    worker.add_argument("--once", action="store_true", help="exit when the queue is empty")
+    worker.add_argument("--metrics-port", type=int, default=METRICS_PORT,
+                        help="serve Prometheus metrics on this port (0 = off)")
+    worker.add_argument("--quiet", action="store_true")
+    worker.set_defaults(func=cmd_worker)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Compiled extraction engine for Trailblazer profile text.
+
+All patterns are compiled and the keyword union of AGENTBLAZER_REQUIREMENTS
+is built once at import. Keywords are found in a single pass with an
+Aho-Corasick automaton when ``pyahocorasick`` is installed, falling back to
+one C-level substring search per keyword otherwise. The engine has no
+browser dependency and can be run against saved text or HTML:
+
+    python extraction.py snapshot.html
+"""
+import json
+import re
+import sys
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional
+
+from agentblazer import AGENTBLAZER_REQUIREMENTS
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional speedup
+    ahocorasick = None
+
+# Tried in order; the first pattern that matches wins
+POINTS_PATTERNS = [re.compile(pattern) for pattern in (
+    r'(\d{1,3}(?:,\d{3})*)\s*points?',
+    r'points?[:\s]*(\d{1,3}(?:,\d{3})*)',
+    r'earned[:\s]*(\d{1,3}(?:,\d{3})*)\s*points?',
+    r'total[:\s]*(\d{1,3}(?:,\d{3})*)\s*points?'
+)]
+
+BADGE_PATTERNS = [re.compile(pattern) for pattern in (
+    r'(\d+)\s*badges?',
+    r'badges?[:\s]*(\d+)',
+    r'earned[:\s]*(\d+)\s*badges?'
+)]
+
+RANK_PATTERNS = [re.compile(pattern) for pattern in (
+    r'(ranger|adventurer|mountaineer|explorer)',
+    r'rank[:\s]*(ranger|adventurer|mountaineer|explorer)'
+)]
+
+# Keyword union across all levels, deduplicated in definition order
+ALL_KEYWORDS = tuple(dict.fromkeys(
+    keyword
+    for requirements in AGENTBLAZER_REQUIREMENTS.values()
+    for keyword in requirements["keywords"]
+))
+
+
+class KeywordMatcher:
+    """Multi-pattern matcher returning every start position of every keyword"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self._automaton = None
+        if ahocorasick is not None and self.keywords:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """{keyword: [start positions]} for the keywords present in ``text``"""
+        positions: Dict[str, List[int]] = {}
+        if self._automaton is not None:
+            for end, keyword in self._automaton.iter(text):
+                positions.setdefault(keyword, []).append(end - len(keyword) + 1)
+        else:
+            for keyword in self.keywords:
+                start = text.find(keyword)
+                while start != -1:
+                    positions.setdefault(keyword, []).append(start)
+                    start = text.find(keyword, start + 1)
+
+        # Report in definition order regardless of backend
+        return {keyword: positions[keyword] for keyword in self.keywords if keyword in positions}
+
+
+KEYWORD_MATCHER = KeywordMatcher(ALL_KEYWORDS)
+
+
+def _first_int(patterns: List[re.Pattern], text: str) -> Optional[int]:
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            try:
+                return int(match.group(1).replace(',', ''))
+            except ValueError:
+                continue
+    return None
+
+
+def extract(text_content: str) -> Dict:
+    """
+    Extract points, badges, rank and keyword matches from lowercased text
+    """
+    rank = ""
+    for pattern in RANK_PATTERNS:
+        rank_match = pattern.search(text_content)
+        if rank_match:
+            rank = rank_match.group(1).title()
+            break
+
+    keyword_positions = KEYWORD_MATCHER.find_all(text_content)
+    return {
+        "points": _first_int(POINTS_PATTERNS, text_content) or 0,
+        "badges": _first_int(BADGE_PATTERNS, text_content) or 0,
+        "rank": rank,
+        "keywords_found": list(keyword_positions),
+        "keyword_positions": keyword_positions
+    }
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text from saved HTML (script/style contents dropped)"""
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "noscript", "template"):
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "noscript", "template") and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip and data.strip():
+            self.parts.append(data.strip())
+
+
+def html_to_text(html: str) -> str:
+    """Approximate ``inner_text('body').lower()`` for a saved HTML snapshot"""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return "\n".join(parser.parts).lower()
+
+
+def extract_from_file(path: str) -> Dict:
+    """Run the engine on a saved .html or .txt snapshot"""
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    text = html_to_text(content) if path.endswith((".html", ".htm")) else content.lower()
+    return extract(text)
+
+
+if __name__ == "__main__":
+    for snapshot in sys.argv[1:]:
+        print(json.dumps({"file": snapshot, **extract_from_file(snapshot)}, indent=2))
@@ -0,0 +1,333 @@
+"""
+Persistent SQLite job queue for batch verification.
+
+The Streamlit app only submits jobs (one item per roster row) and reads
+their progress; ``python -m cli worker`` processes claim items, scrape and
+score them, and write the result rows back. Because the queue lives under
+./data, any number of app replicas and workers can share it. Claims are
+leased (and renewed by live workers), so items held by a worker that died
+are picked up again; all runnable rows of a profile are claimed together,
+and an item is not handed out while another worker is already scraping the
+same profile.
+"""
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from profile_cache import DATA_DIR
+from profile_urls import normalize_profile_url
+
+QUEUE_PATH = os.environ.get("JOB_QUEUE_PATH", os.path.join(DATA_DIR, "jobs.sqlite3"))
+LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "300"))
+MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+RETRY_DELAY_SECONDS = 30
+WORKER_TIMEOUT_SECONDS = 60
+HEARTBEAT_SECONDS = 15  # workers heartbeat and renew their leases this often
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    level TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    options TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    row TEXT NOT NULL,
+    profile_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    result TEXT,
+    worker_id TEXT,
+    lease_expires REAL,
+    not_before REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS items_status ON items (status, not_before);
+CREATE INDEX IF NOT EXISTS items_profile ON items (profile_key, status);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    busy INTEGER NOT NULL,
+    processed INTEGER NOT NULL,
+    last_seen REAL NOT NULL
+);
+"""
+
+# Job states: queued -> running -> finished | cancelled
+# Item states: pending -> running -> done | failed | cancelled (failed items
+# with attempts left go back to pending after a delay)
+
+
+class JobQueue:
+    """SQLite-backed job/item store shared by app replicas and workers"""
+
+    def __init__(self, path: str = QUEUE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction that takes the database lock up front"""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    # Submitting and controlling jobs
+
+    def submit(self, rows: Iterable[Dict], level: str, options: Optional[Dict] = None) -> str:
+        """Queue a job; ``rows`` may be a generator (e.g. a streamed roster)"""
+        job_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, level, status, total, options, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', 0, ?, ?, ?)",
+                (job_id, level, json.dumps(options or {}), now, now)
+            )
+            conn.executemany(
+                "INSERT INTO items (job_id, idx, row, profile_key, status, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?)",
+                (
+                    (job_id, idx, json.dumps(row, default=str), normalize_profile_url(row["Salesforce URL"]), now)
+                    for idx, row in enumerate(rows)
+                )
+            )
+            conn.execute(
+                "UPDATE jobs SET total = (SELECT COUNT(*) FROM items WHERE job_id = ?) WHERE id = ?",
+                (job_id, job_id)
+            )
+        return job_id
+
+    def cancel(self, job_id: str):
+        """Stop handing out a job's items; items already running finish normally"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET status = 'cancelled', updated_at = ? WHERE id = ?", (now, job_id))
+            conn.execute(
+                "UPDATE items SET status = 'cancelled', updated_at = ? WHERE job_id = ? AND status = 'pending'",
+                (now, job_id)
+            )
+
+    # Worker side
+
+    def claim(self, worker_id: str, limit: int = 1, lease_seconds: int = LEASE_SECONDS) -> List[Dict]:
+        """
+        Lease runnable items for up to ``limit`` rows' worth of profiles:
+        pending (and past their retry delay) or running with an expired
+        lease, from jobs that are not cancelled, skipping profiles another
+        worker is scraping right now. Every runnable row of a chosen profile
+        is claimed with it (so the result may exceed ``limit``), letting the
+        batch engine scrape each profile once.
+        """
+        now = time.time()
+        runnable = """
+            FROM items i JOIN jobs j ON j.id = i.job_id
+            WHERE j.status IN ('queued', 'running')
+              AND ((i.status = 'pending' AND i.not_before <= :now)
+                   OR (i.status = 'running' AND i.lease_expires < :now))
+              AND NOT EXISTS (
+                  SELECT 1 FROM items busy
+                  WHERE busy.profile_key = i.profile_key AND busy.status = 'running'
+                    AND busy.lease_expires >= :now
+              )
+        """
+        with self._transaction() as conn:
+            candidates = conn.execute(
+                f"SELECT i.profile_key {runnable} ORDER BY j.created_at, i.idx LIMIT :limit",
+                {"now": now, "limit": limit}
+            ).fetchall()
+            profile_keys = list(dict.fromkeys(key for (key,) in candidates))
+            if not profile_keys:
+                return []
+
+            keys = {f"key{n}": key for n, key in enumerate(profile_keys)}
+            rows = conn.execute(
+                f"SELECT i.job_id, i.idx, i.row, i.attempts, j.level, j.options {runnable} "
+                f"AND i.profile_key IN ({', '.join(':' + name for name in keys)}) ORDER BY j.created_at, i.idx",
+                {"now": now, **keys}
+            ).fetchall()
+
+            claimed = []
+            for job_id, idx, row, attempts, level, options in rows:
+                conn.execute(
+                    "UPDATE items SET status = 'running', worker_id = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE job_id = ? AND idx = ?",
+                    (worker_id, now + lease_seconds, now, job_id, idx)
+                )
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                    (now, job_id)
+                )
+                claimed.append({
+                    "job_id": job_id,
+                    "idx": idx,
+                    "row": json.loads(row),
+                    "level": level,
+                    "options": json.loads(options),
+                    "attempt": attempts + 1
+                })
+        return claimed
+
+    def renew_leases(self, worker_id: str, lease_seconds: int = LEASE_SECONDS) -> int:
+        """Extend the leases of the items a live worker is still processing"""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE items SET lease_expires = ? WHERE worker_id = ? AND status = 'running'",
+                (now + lease_seconds, worker_id)
+            ).rowcount
+
+    def complete(self, job_id: str, idx: int, worker_id: str, result: Dict, error: Optional[str] = None,
+                 max_attempts: int = MAX_ATTEMPTS, retry_delay: float = RETRY_DELAY_SECONDS) -> bool:
+        """
+        Record an item's result row; failed items are re-queued while
+        attempts remain. Only the worker holding the item's lease may
+        complete it: False (nothing written) when the lease was lost to
+        another worker or the item is no longer running.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            owned = conn.execute(
+                "SELECT attempts FROM items WHERE job_id = ? AND idx = ? AND worker_id = ? AND status = 'running'",
+                (job_id, idx, worker_id)
+            ).fetchone()
+            if owned is None:
+                return False
+            attempts = owned[0]
+            if error and attempts < max_attempts:
+                status, not_before = "pending", now + retry_delay * attempts
+            else:
+                status, not_before = ("failed" if error else "done"), 0
+            updated = conn.execute(
+                "UPDATE items SET status = ?, result = ?, last_error = ?, not_before = ?, "
+                "lease_expires = NULL, updated_at = ? "
+                "WHERE job_id = ? AND idx = ? AND worker_id = ? AND status = 'running'",
+                (status, json.dumps(result, default=str), error, not_before, now, job_id, idx, worker_id)
+            ).rowcount
+            if not updated:
+                return False
+            self._finish_if_done(conn, job_id, now)
+        return True
+
+    def _finish_if_done(self, conn: sqlite3.Connection, job_id: str, now: float):
+        open_items = conn.execute(
+            "SELECT COUNT(*) FROM items WHERE job_id = ? AND status IN ('pending', 'running')", (job_id,)
+        ).fetchone()[0]
+        if not open_items:
+            conn.execute(
+                "UPDATE jobs SET status = 'finished', updated_at = ? WHERE id = ? AND status != 'cancelled'",
+                (now, job_id)
+            )
+
+    def heartbeat(self, worker_id: str, busy: bool, processed: int):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO workers (id, host, pid, busy, processed, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (worker_id, socket.gethostname(), os.getpid(), int(busy), processed, time.time())
+            )
+
+    def unregister(self, worker_id: str):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+
+    # Queries
+
+    def job_status(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            job = conn.execute(
+                "SELECT id, level, status, total, created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+            retrying = conn.execute(
+                "SELECT COUNT(*) FROM items WHERE job_id = ? AND status = 'pending' AND attempts > 0", (job_id,)
+            ).fetchone()[0]
+
+        job_id, level, status, total, created_at, updated_at = job
+        completed = counts.get("done", 0) + counts.get("failed", 0)
+        return {
+            "job_id": job_id,
+            "level": level,
+            "status": status,
+            "total": total,
+            "completed": completed,
+            "failed": counts.get("failed", 0),
+            "retrying": retrying,
+            "items": counts,
+            "created_at": created_at,
+            "updated_at": updated_at
+        }
+
+    def list_jobs(self, limit: int = 20) -> List[Dict]:
+        with self._connect() as conn:
+            job_ids = [row[0] for row in conn.execute(
+                "SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            )]
+        return [status for status in map(self.job_status, job_ids) if status]
+
+    def results(self, job_id: str) -> List[Dict]:
+        """Result rows written so far, in roster order"""
+        with self._connect() as conn:
+            return [
+                json.loads(result) for (result,) in conn.execute(
+                    "SELECT result FROM items WHERE job_id = ? AND status IN ('done', 'failed') ORDER BY idx",
+                    (job_id,)
+                )
+            ]
+
+    def depth(self) -> int:
+        """Items waiting to be claimed"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM items i JOIN jobs j ON j.id = i.job_id "
+                "WHERE i.status = 'pending' AND j.status IN ('queued', 'running')"
+            ).fetchone()[0]
+
+    def workers(self) -> List[Dict]:
+        """Workers that sent a heartbeat recently"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, host, pid, busy, processed, last_seen FROM workers WHERE last_seen > ?",
+                (time.time() - WORKER_TIMEOUT_SECONDS,)
+            ).fetchall()
+        return [
+            {"id": r[0], "host": r[1], "pid": r[2], "busy": bool(r[3]), "processed": r[4], "last_seen": r[5]}
+            for r in rows
+        ]
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
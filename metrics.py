@@ -0,0 +1,246 @@
+"""
+In-process scraper metrics: per-stage timing histograms, counters and
+gauges, exposed in the Prometheus text format.
+
+Scrapes time each stage with ``StageTimings`` (browser launch, pool wait,
+goto, readiness wait, in-page extraction, optional HTML archive, API
+merge, verification), which both records the profile's own ``timings_ms`` and
+feeds a shared histogram per stage. ``start_metrics_server`` serves
+``/metrics`` from a background thread for Prometheus to scrape; the app's
+diagnostics panel reads ``snapshot()`` directly.
+"""
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+METRICS_PORT = int(os.environ.get("SCRAPER_METRICS_PORT", "0"))  # 0 = no endpoint
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RECENT_SAMPLES = 1000
+
+STAGE_METRIC = "scraper_stage_seconds"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram plus a window of recent samples for percentiles"""
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentile(self, pct: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _labels(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Metrics:
+    """Thread-safe registry of histograms, counters and gauges"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauge_callbacks: Dict[str, Callable[[], float]] = {}
+        self.describe(STAGE_METRIC, "histogram", "Time spent in each stage of a profile scrape")
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def observe(self, name: str, value: float, **labels):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(_labels(labels))
+            if histogram is None:
+                histogram = series[_labels(labels)] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _labels(labels)
+            series[key] = series.get(key, 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges.setdefault(name, {})[_labels(labels)] = value
+
+    def add_gauge(self, name: str, delta: float, **labels):
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            key = _labels(labels)
+            series[key] = series.get(key, 0.0) + delta
+
+    def register_gauge(self, name: str, help_text: str, callback: Callable[[], float]):
+        """Gauge whose value is read from ``callback`` at collection time"""
+        self.describe(name, "gauge", help_text)
+        with self._lock:
+            self._gauge_callbacks[name] = callback
+
+    def _gauge_values(self) -> Dict[str, Dict[LabelKey, float]]:
+        with self._lock:
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            callbacks = dict(self._gauge_callbacks)
+        for name, callback in callbacks.items():
+            try:
+                gauges[name] = {(): float(callback())}
+            except Exception:
+                continue
+        return gauges
+
+    def snapshot(self) -> Dict:
+        """Plain-dict view for the diagnostics panel"""
+        with self._lock:
+            stages = {
+                dict(key).get("stage", ""): {
+                    "count": h.count,
+                    "mean_ms": round(1000 * h.sum / h.count, 1) if h.count else 0.0,
+                    "p50_ms": round(1000 * h.percentile(50), 1),
+                    "p95_ms": round(1000 * h.percentile(95), 1),
+                    "p99_ms": round(1000 * h.percentile(99), 1)
+                }
+                for key, h in self._histograms.get(STAGE_METRIC, {}).items()
+            }
+            counters = {
+                name: {_format_labels(key) or "total": value for key, value in series.items()}
+                for name, series in self._counters.items()
+            }
+        gauges = {
+            name: {_format_labels(key) or "value": value for key, value in series.items()}
+            for name, series in self._gauge_values().items()
+        }
+        return {"stages": stages, "counters": counters, "gauges": gauges}
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+
+        def header(name: str, default_kind: str):
+            kind, help_text = self._help.get(name, (default_kind, name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            histograms = {name: dict(series) for name, series in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            for name, series in sorted(histograms.items()):
+                header(name, "histogram")
+                for key, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(h.buckets, h.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', repr(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {h.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {h.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+
+        for name, series in sorted(counters.items()):
+            header(name, "counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+        for name, series in sorted(self._gauge_values().items()):
+            header(name, "gauge")
+            for key, value in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+class StageTimings:
+    """Per-profile stage timer; every stage also lands in the shared histograms"""
+
+    def __init__(self, metrics: Optional[Metrics] = None):
+        self.metrics = metrics or get_metrics()
+        self.ms: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float):
+        self.ms[name] = round(self.ms.get(name, 0.0) + seconds * 1000, 1)
+        self.metrics.observe(STAGE_METRIC, seconds, stage=name)
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def get_metrics() -> Metrics:
+    """Process-wide metrics registry"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = get_metrics().render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = "0.0.0.0") -> Optional[int]:
+    """
+    Serve /metrics on a daemon thread (once per process); returns the bound
+    port, or None when ``port`` is 0 or the port is already taken
+    """
+    global _server
+    with _metrics_lock:
+        if _server is not None:
+            return _server.server_address[1]
+        if not port:
+            return None
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError:
+            return None
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server.server_address[1]
@@ -0,0 +1,207 @@
+"""
+Lean in-page extraction for rendered Trailblazer profiles.
+
+Instead of serializing the whole DOM with ``page.content()`` and copying the
+body text back with ``inner_text``, one ``page.evaluate`` runs the same
+patterns and keyword list as ``extraction.extract`` inside the page and
+returns only the compact fields: points, badges, rank, matched keywords
+and badge titles (plus the text itself when it is short enough to be a
+bot-wall page). ``extract_page_until`` clicks the profile's "show more"
+control only while the caller's decision is still open, so heavy profiles
+do not load their whole badge history.
+
+Raw HTML is only captured when ``SCRAPER_ARCHIVE_HTML`` is set, for
+debugging or archiving, and is written gzipped under ``data/html_archive``.
+"""
+import gzip
+import os
+import time
+from typing import Callable, Dict, Optional
+
+from extraction import ALL_KEYWORDS, BADGE_PATTERNS, POINTS_PATTERNS, RANK_PATTERNS
+from profile_cache import DATA_DIR
+from profile_urls import profile_handle
+from retry_policy import BLOCKED_PAGE_MAX_CHARS
+
+ARCHIVE_HTML = os.environ.get("SCRAPER_ARCHIVE_HTML", "0").lower() in ("1", "true", "yes")
+ARCHIVE_DIR = os.environ.get("SCRAPER_ARCHIVE_DIR", os.path.join(DATA_DIR, "html_archive"))
+
+# Elements holding badge names on the profile page
+BADGE_TITLE_SELECTORS = [
+    '[data-test="badge-title"]',
+    '.badge-title',
+    'lwc-tbme-badge .title',
+    'a[href*="/content/learn/"] h3'
+]
+
+# "Show more" controls of the badge list (Playwright selectors, tried in order)
+LOAD_MORE_SELECTORS = [
+    '[data-test="load-more"]',
+    'button:has-text("Show More")',
+    'button:has-text("Load More")'
+]
+MAX_BADGE_PAGES = int(os.environ.get("SCRAPER_MAX_BADGE_PAGES", "20"))
+LOAD_MORE_TIMEOUT_MS = 3000
+
+_TEXT_GREW_SCRIPT = "n => ((document.body && document.body.innerText) || '').length > n"
+
+_EXTRACT_SCRIPT = """
+({points, badges, rank, keywords, badgeSelectors, maxShortText}) => {
+    const text = ((document.body && document.body.innerText) || '').toLowerCase();
+    const firstInt = (sources) => {
+        for (const source of sources) {
+            const match = text.match(new RegExp(source));
+            if (match) {
+                const value = parseInt(match[1].replace(/,/g, ''), 10);
+                if (!Number.isNaN(value)) return value;
+            }
+        }
+        return null;
+    };
+    let rankFound = '';
+    for (const source of rank) {
+        const match = text.match(new RegExp(source));
+        if (match) { rankFound = match[1]; break; }
+    }
+    const titles = [];
+    for (const selector of badgeSelectors) {
+        for (const el of document.querySelectorAll(selector)) {
+            const title = (el.innerText || el.textContent || '').trim();
+            if (title) titles.push(title);
+        }
+    }
+    return {
+        points: firstInt(points),
+        badges: firstInt(badges),
+        rank: rankFound,
+        keywords_found: keywords.filter(keyword => text.includes(keyword)),
+        badge_titles: [...new Set(titles)],
+        text_chars: text.length,
+        short_text: text.length < maxShortText ? text : ''
+    };
+}
+"""
+
+# Built once: pattern sources are plain enough to compile as JS regexes
+_EXTRACT_ARGS = {
+    "points": [pattern.pattern for pattern in POINTS_PATTERNS],
+    "badges": [pattern.pattern for pattern in BADGE_PATTERNS],
+    "rank": [pattern.pattern for pattern in RANK_PATTERNS],
+    "keywords": list(ALL_KEYWORDS),
+    "badgeSelectors": BADGE_TITLE_SELECTORS,
+    "maxShortText": BLOCKED_PAGE_MAX_CHARS
+}
+
+
+def _finish(raw: Dict) -> Dict:
+    """Same shape and defaults as ``extraction.extract`` (minus keyword positions)"""
+    return {
+        "points": raw["points"] or 0,
+        "badges": raw["badges"] or 0,
+        "rank": raw["rank"].title(),
+        "keywords_found": raw["keywords_found"],
+        "badge_titles": raw["badge_titles"],
+        "text_chars": raw["text_chars"],
+        "short_text": raw["short_text"]
+    }
+
+
+def extract_page(page) -> Dict:
+    return _finish(page.evaluate(_EXTRACT_SCRIPT, _EXTRACT_ARGS))
+
+
+async def extract_page_async(page) -> Dict:
+    return _finish(await page.evaluate(_EXTRACT_SCRIPT, _EXTRACT_ARGS))
+
+
+def _load_more(page, text_chars: int) -> bool:
+    """Click the first visible "show more" control; False when there is none or nothing loaded"""
+    for selector in LOAD_MORE_SELECTORS:
+        button = page.locator(selector).first
+        if button.count() and button.is_visible():
+            try:
+                button.click(timeout=LOAD_MORE_TIMEOUT_MS)
+                page.wait_for_function(_TEXT_GREW_SCRIPT, arg=text_chars, timeout=LOAD_MORE_TIMEOUT_MS)
+                return True
+            except Exception:
+                return False
+    return False
+
+
+async def _load_more_async(page, text_chars: int) -> bool:
+    for selector in LOAD_MORE_SELECTORS:
+        button = page.locator(selector).first
+        if await button.count() and await button.is_visible():
+            try:
+                await button.click(timeout=LOAD_MORE_TIMEOUT_MS)
+                await page.wait_for_function(_TEXT_GREW_SCRIPT, arg=text_chars, timeout=LOAD_MORE_TIMEOUT_MS)
+                return True
+            except Exception:
+                return False
+    return False
+
+
+def extract_page_until(page, is_decided: Callable[[Dict], bool], max_pages: int = MAX_BADGE_PAGES) -> Dict:
+    """
+    Extract, then keep loading more badges while ``is_decided(extracted)``
+    is False and the page offers more. ``badge_pages`` counts the extra
+    pages loaded and ``badges_stop`` says why loading stopped (decided,
+    exhausted or max_pages).
+    """
+    extracted = extract_page(page)
+    pages, stop = 0, "decided"
+    while not is_decided(extracted):
+        if pages >= max_pages:
+            stop = "max_pages"
+            break
+        if not _load_more(page, extracted["text_chars"]):
+            stop = "exhausted"
+            break
+        pages += 1
+        extracted = extract_page(page)
+    extracted.update(badge_pages=pages, badges_stop=stop)
+    return extracted
+
+
+async def extract_page_until_async(
+    page, is_decided: Callable[[Dict], bool], max_pages: int = MAX_BADGE_PAGES
+) -> Dict:
+    extracted = await extract_page_async(page)
+    pages, stop = 0, "decided"
+    while not is_decided(extracted):
+        if pages >= max_pages:
+            stop = "max_pages"
+            break
+        if not await _load_more_async(page, extracted["text_chars"]):
+            stop = "exhausted"
+            break
+        pages += 1
+        extracted = await extract_page_async(page)
+    extracted.update(badge_pages=pages, badges_stop=stop)
+    return extracted
+
+
+def archive_path(url: str) -> str:
+    handle = profile_handle(url) or "unknown"
+    return os.path.join(ARCHIVE_DIR, handle, time.strftime("%Y%m%d-%H%M%S") + ".html.gz")
+
+
+def write_archive(url: str, html: str) -> str:
+    path = archive_path(url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(html)
+    return path
+
+
+def archive_page(page, url: str) -> Optional[str]:
+    """Save the rendered HTML when archiving is enabled; returns the file path"""
+    if not ARCHIVE_HTML:
+        return None
+    return write_archive(url, page.content())
+
+
+async def archive_page_async(page, url: str) -> Optional[str]:
+    if not ARCHIVE_HTML:
+        return None
+    return write_archive(url, await page.content())
@@ -0,0 +1,191 @@
+"""
+Persistent SQLite cache of scraped profiles under ./data.
+
+Entries are keyed by normalized profile URL and survive restarts; every
+app replica or worker mounting the same volume shares them. Successful
+and failed scrapes get separate TTLs, the total stored size is capped with
+least-recently-used eviction, and API ETags are kept so stale entries can
+be revalidated instead of re-scraped.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from profile_urls import normalize_profile_url
+
+DATA_DIR = os.environ.get("DATA_DIR", "data")
+CACHE_PATH = os.environ.get("PROFILE_CACHE_PATH", os.path.join(DATA_DIR, "profile_cache.sqlite3"))
+SUCCESS_TTL = int(os.environ.get("PROFILE_CACHE_TTL", "3600"))
+ERROR_TTL = int(os.environ.get("PROFILE_CACHE_ERROR_TTL", "300"))
+MAX_BYTES = int(float(os.environ.get("PROFILE_CACHE_MAX_MB", "200")) * 1024 * 1024)
+_KEY_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    etags TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_last_access ON profiles (last_access);
+"""
+
+
+class ProfileCache:
+    """SQLite-backed profile cache with success/error TTLs and size-based eviction"""
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        success_ttl: int = SUCCESS_TTL,
+        error_ttl: int = ERROR_TTL,
+        max_bytes: int = MAX_BYTES
+    ):
+        self.path = path
+        self.success_ttl = success_ttl
+        self.error_ttl = error_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Cached entry (fresh or stale) as {data, fresh, etags, fetched_at}"""
+        key = normalize_profile_url(url)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data, etags, fetched_at, expires_at FROM profiles WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE profiles SET last_access = ? WHERE key = ?", (now, key))
+
+        data, etags, fetched_at, expires_at = row
+        return {
+            "data": json.loads(data),
+            "fresh": expires_at > now,
+            "etags": json.loads(etags) if etags else None,
+            "fetched_at": fetched_at
+        }
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Profile data if a fresh entry exists"""
+        entry = self.lookup(url)
+        return entry["data"] if entry and entry["fresh"] else None
+
+    def put(self, url: str, profile_data: Dict, etags: Optional[List[str]] = None):
+        key = normalize_profile_url(url)
+        now = time.time()
+        ttl = self.success_ttl if profile_data.get("success", False) else self.error_ttl
+        data = json.dumps(profile_data)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles "
+                "(key, url, success, data, etags, fetched_at, expires_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, url, int(bool(profile_data.get("success", False))), data,
+                    json.dumps(etags) if etags else None,
+                    now, now + ttl, now, len(data)
+                )
+            )
+            self._evict(conn)
+
+    def touch(self, url: str):
+        """Revalidated unchanged (e.g. HTTP 304): extend the entry's lifetime"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE profiles SET fetched_at = ?, last_access = ?, "
+                "expires_at = ? + CASE success WHEN 1 THEN ? ELSE ? END WHERE key = ?",
+                (now, now, now, self.success_ttl, self.error_ttl, normalize_profile_url(url))
+            )
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM profiles").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Evict down to 90% so every insert near the limit doesn't trigger a sweep
+        target = int(self.max_bytes * 0.9)
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM profiles ORDER BY last_access"):
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM profiles WHERE key = ?", doomed)
+
+    def stale_urls(self, urls: Iterable[str]) -> List[str]:
+        """URLs that are missing from the cache or whose entry has expired"""
+        now = time.time()
+        urls = list(urls)
+        keys = list(dict.fromkeys(normalize_profile_url(url) for url in urls))
+        fresh = set()
+        with self._connect() as conn:
+            # Only the given keys, in batches below SQLite's parameter limit
+            for start in range(0, len(keys), _KEY_BATCH):
+                batch = keys[start:start + _KEY_BATCH]
+                fresh.update(key for (key,) in conn.execute(
+                    f"SELECT key FROM profiles WHERE expires_at > ? AND key IN ({', '.join('?' * len(batch))})",
+                    (now, *batch)
+                ))
+        return [url for url in urls if normalize_profile_url(url) not in fresh]
+
+    def iter_profiles(self, include_errors: bool = False) -> Iterator[Dict]:
+        """Every cached profile (fresh or stale), e.g. for re-grading without scraping"""
+        query = "SELECT data FROM profiles" + ("" if include_errors else " WHERE success = 1")
+        with self._connect() as conn:
+            for (data,) in conn.execute(query):
+                yield json.loads(data)
+
+    def stats(self) -> Dict:
+        now = time.time()
+        with self._connect() as conn:
+            total, size, fresh, errors = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), "
+                "COALESCE(SUM(expires_at > ?), 0), COALESCE(SUM(success = 0), 0) FROM profiles",
+                (now,)
+            ).fetchone()
+        return {"entries": total, "bytes": size, "fresh": fresh, "errors": errors}
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM profiles")
+
+
+_cache: Optional[ProfileCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> ProfileCache:
+    """Return the process-wide profile cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ProfileCache()
+        return _cache
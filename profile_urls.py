@@ -0,0 +1,88 @@
+"""
+Profile URL canonicalization used for cache keys and batch deduplication
+"""
+from typing import Dict, List, Optional, Set
+from urllib.parse import unquote, urlsplit, urlunsplit
+
+CANONICAL_PROFILE_PREFIX = "https://www.salesforce.com/trailblazer/"
+
+# Host -> path segments that precede the profile handle
+PROFILE_PATHS = {
+    "salesforce.com": (["trailblazer", "id"], ["trailblazer"]),
+    "trailblazer.me": (["id"],)
+}
+
+
+def profile_handle(url: str) -> Optional[str]:
+    """
+    Trailblazer handle from any known profile URL form, e.g.
+    salesforce.com/trailblazer/<handle>, salesforce.com/trailblazer/id/<handle>
+    or trailblazer.me/id/<handle> (any scheme, case, query or trailing
+    slash); None for anything else
+    """
+    text = str(url).strip().lower()
+    if "://" not in text:
+        text = "https://" + text
+    parts = urlsplit(text)
+    host = parts.hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    segments = [unquote(segment) for segment in parts.path.split("/") if segment]
+
+    for prefix in PROFILE_PATHS.get(host, ()):
+        if segments[:len(prefix)] == prefix and len(segments) > len(prefix):
+            return segments[len(prefix)]
+    return None
+
+
+def is_profile_url(url: str) -> bool:
+    return profile_handle(url) is not None
+
+
+def normalize_profile_url(url: str) -> str:
+    """
+    Canonical key for a profile URL. Every Trailblazer form maps to
+    https://www.salesforce.com/trailblazer/<handle>; other URLs are only
+    trimmed, lowercased and stripped of query string, fragment and
+    trailing slash
+    """
+    handle = profile_handle(url)
+    if handle:
+        return CANONICAL_PROFILE_PREFIX + handle
+    parts = urlsplit(str(url).strip().lower())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme or "https", parts.netloc, path, "", ""))
+
+
+class ProfileIndex:
+    """
+    Groups batch rows by canonical profile so each profile is scraped once
+    and its result fanned out to every matching row. Counts accumulate over
+    every ``group`` call, so one index can follow a roster read in chunks.
+    """
+
+    def __init__(self):
+        self.rows_seen = 0
+        self.repeated: Set[str] = set()
+        self._profiles: Set[str] = set()
+
+    def group(self, rows: List[Dict], url_column: str = "Salesforce URL") -> Dict[str, List[int]]:
+        """
+        Canonical URL -> positions of the rows that reference it.
+        ``repeated`` is set to the profiles already grouped by an earlier call.
+        """
+        groups: Dict[str, List[int]] = {}
+        for position, row in enumerate(rows):
+            groups.setdefault(normalize_profile_url(row[url_column]), []).append(position)
+        self.repeated = self._profiles.intersection(groups)
+        self.rows_seen += len(rows)
+        self._profiles.update(groups)
+        return groups
+
+    @property
+    def profiles(self) -> int:
+        return len(self._profiles)
+
+    @property
+    def scrapes_saved(self) -> int:
+        return self.rows_seen - self.profiles
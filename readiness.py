@@ -0,0 +1,94 @@
+"""
+Selector/text driven readiness detection for rendered Trailblazer profiles.
+
+Instead of waiting for ``networkidle`` plus a fixed 5 seconds, scrapes wait
+only until the profile stats are on the page: any of ``READY_SELECTORS``
+exists, or every regex in ``READY_TEXT_PROBES`` matches the body text. If
+neither happens within the timeout the scrape carries on with whatever has
+rendered. The path taken is reported as ``selector:<css>``, ``text`` or
+``timeout``.
+"""
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+READY_TIMEOUT_MS = int(os.environ.get("SCRAPER_READY_TIMEOUT_MS", "5000"))
+READY_POLL_MS = 100
+
+# Stats widgets on the Trailblazer profile page
+READY_SELECTORS = [
+    '[data-test="points"]',
+    '[data-test="badges"]',
+    '.tds-tally__count',
+    'tbme-rank'
+]
+
+# All probes must match the rendered text (case-insensitive)
+READY_TEXT_PROBES = [
+    r'\d[\d,]*\s*points?',
+    r'\d+\s*badges?'
+]
+
+_READY_SCRIPT = """
+({selectors, probes}) => {
+    for (const selector of selectors) {
+        if (document.querySelector(selector)) return 'selector:' + selector;
+    }
+    if (probes.length && document.body) {
+        const text = document.body.innerText || '';
+        if (probes.every(probe => new RegExp(probe, 'i').test(text))) return 'text';
+    }
+    return false;
+}
+"""
+
+
+def _probe_args(selectors: Optional[List[str]], text_probes: Optional[List[str]]) -> Dict:
+    return {
+        "selectors": READY_SELECTORS if selectors is None else selectors,
+        "probes": READY_TEXT_PROBES if text_probes is None else text_probes
+    }
+
+
+def wait_for_profile_ready(
+    page,
+    selectors: Optional[List[str]] = None,
+    text_probes: Optional[List[str]] = None,
+    timeout_ms: int = READY_TIMEOUT_MS
+) -> Tuple[str, float]:
+    """Block until the profile stats render; returns (path taken, elapsed ms)"""
+    started = time.perf_counter()
+    try:
+        handle = page.wait_for_function(
+            _READY_SCRIPT,
+            arg=_probe_args(selectors, text_probes),
+            timeout=timeout_ms,
+            polling=READY_POLL_MS
+        )
+        path = handle.json_value()
+    except PlaywrightTimeoutError:
+        path = "timeout"
+    return path, (time.perf_counter() - started) * 1000
+
+
+async def wait_for_profile_ready_async(
+    page,
+    selectors: Optional[List[str]] = None,
+    text_probes: Optional[List[str]] = None,
+    timeout_ms: int = READY_TIMEOUT_MS
+) -> Tuple[str, float]:
+    """Async counterpart of ``wait_for_profile_ready``"""
+    started = time.perf_counter()
+    try:
+        handle = await page.wait_for_function(
+            _READY_SCRIPT,
+            arg=_probe_args(selectors, text_probes),
+            timeout=timeout_ms,
+            polling=READY_POLL_MS
+        )
+        path = await handle.json_value()
+    except PlaywrightTimeoutError:
+        path = "timeout"
+    return path, (time.perf_counter() - started) * 1000
@@ -0,0 +1,139 @@
+"""
+Request interception that keeps scrapes down to the documents and scripts
+needed to render profile text.
+
+A ``ResourceBlocker`` is installed as a route handler on a browser context.
+It aborts heavy resource types (images, fonts, stylesheets, media) and
+known analytics/ad hosts, or in allowlist mode everything not served from
+an allowed domain, and keeps per-run counters. Aborted requests never
+download, so their size is unknown; ``allowed_bytes`` reports what was
+actually transferred instead.
+"""
+import os
+import threading
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+BLOCK_RESOURCES = os.environ.get("SCRAPER_BLOCK_RESOURCES", "1") != "0"
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+
+TRACKER_DOMAINS = {
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.net",
+    "bat.bing.com",
+    "ads.linkedin.com",
+    "px.ads.linkedin.com",
+    "hotjar.com",
+    "demdex.net",
+    "omtrdc.net",
+    "adobedtm.com",
+    "everesttech.net",
+    "cookielaw.org",
+    "onetrust.com",
+    "qualtrics.com",
+    "6sc.co",
+    "bizible.com",
+    "krxd.net"
+}
+
+# Comma-separated domains; when set, only these hosts may be contacted
+ALLOWED_DOMAINS = [
+    domain.strip().lower()
+    for domain in os.environ.get("SCRAPER_ALLOWED_DOMAINS", "").split(",")
+    if domain.strip()
+]
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class ResourceBlocker:
+    """Route handler that aborts unwanted requests and counts what it did"""
+
+    def __init__(
+        self,
+        blocked_types: Optional[Iterable[str]] = None,
+        tracker_domains: Optional[Iterable[str]] = None,
+        allowed_domains: Optional[Iterable[str]] = None
+    ):
+        self.blocked_types = set(BLOCKED_RESOURCE_TYPES if blocked_types is None else blocked_types)
+        self.tracker_domains = set(TRACKER_DOMAINS if tracker_domains is None else tracker_domains)
+        self.allowed_domains = list(ALLOWED_DOMAINS if allowed_domains is None else allowed_domains)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests_seen = 0
+            self.requests_blocked = 0
+            self.allowed_bytes = 0
+            self.blocked_by_reason: Dict[str, int] = {}
+
+    def block_reason(self, url: str, resource_type: str) -> Optional[str]:
+        """Why a request should be aborted, or None to let it through"""
+        host = (urlparse(url).hostname or "").lower()
+        if url.startswith("data:"):
+            return None
+        if self.allowed_domains and not _host_matches(host, self.allowed_domains):
+            return "not-allowlisted"
+        if _host_matches(host, self.tracker_domains):
+            return "tracker"
+        if resource_type in self.blocked_types:
+            return resource_type
+        return None
+
+    def _record(self, reason: Optional[str]):
+        with self._lock:
+            self.requests_seen += 1
+            if reason:
+                self.requests_blocked += 1
+                self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+
+    def _record_response(self, response):
+        size = response.headers.get("content-length")
+        if size and size.isdigit():
+            with self._lock:
+                self.allowed_bytes += int(size)
+
+    def handle(self, route):
+        """Sync Playwright route handler"""
+        request = route.request
+        reason = self.block_reason(request.url, request.resource_type)
+        self._record(reason)
+        if reason:
+            route.abort()
+        else:
+            route.continue_()
+
+    async def handle_async(self, route):
+        """Async Playwright route handler"""
+        request = route.request
+        reason = self.block_reason(request.url, request.resource_type)
+        self._record(reason)
+        if reason:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def install(self, context):
+        context.route("**/*", self.handle)
+        context.on("response", self._record_response)
+
+    async def install_async(self, context):
+        await context.route("**/*", self.handle_async)
+        context.on("response", self._record_response)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "requests_seen": self.requests_seen,
+                "requests_blocked": self.requests_blocked,
+                "allowed_bytes": self.allowed_bytes,
+                "blocked_by_reason": dict(self.blocked_by_reason)
+            }
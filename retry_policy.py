@@ -0,0 +1,254 @@
+"""
+Error classification, retries with jittered backoff, and a shared circuit
+breaker for profile scraping.
+
+Every failed scrape is mapped to a stable error code (``nav_timeout``,
+``dns``, ``http_429``, ``http_5xx``, ``blocked``, ...). Transient codes are
+retried with full-jitter exponential backoff (honouring ``Retry-After`` on
+429s); permanent ones such as ``not_found`` fail immediately. All scrapes in
+a process report to one ``CircuitBreaker``: when the recent failure rate
+spikes it opens and every caller pauses for a cooldown; then a few trial
+scrapes decide whether it closes again, so a throttled or unreachable site
+is not hammered by a whole batch.
+"""
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
+
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+MAX_ATTEMPTS = int(os.environ.get("SCRAPER_MAX_ATTEMPTS", "3"))
+BACKOFF_BASE_SECONDS = float(os.environ.get("SCRAPER_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX_SECONDS = 30.0
+
+BREAKER_WINDOW = 20
+BREAKER_MIN_CALLS = 5
+BREAKER_FAILURE_RATE = float(os.environ.get("SCRAPER_BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_COOLDOWN_SECONDS = float(os.environ.get("SCRAPER_BREAKER_COOLDOWN", "30"))
+BREAKER_MAX_COOLDOWN_SECONDS = 300.0
+BREAKER_TRIAL_CALLS = 3
+BREAKER_TRIAL_POLL_SECONDS = 1.0
+
+# Error codes and whether they are worth retrying
+ERROR_CODES = {
+    "nav_timeout": True,
+    "dns": True,
+    "network": True,
+    "http_429": True,
+    "http_5xx": True,
+    "browser_crash": True,
+    "pool_timeout": True,
+    "blocked": True,
+    "not_found": False,
+    "http_4xx": False,
+    "invalid_url": False,
+    "unknown": False
+}
+
+# Markers of bot walls / interstitials served instead of the profile; real
+# profiles are long, so only pages shorter than this are checked
+BLOCKED_PAGE_MAX_CHARS = 2000
+BLOCKED_PAGE_PATTERNS = re.compile(
+    r"access denied|verify you are (a )?human|unusual traffic|captcha|request blocked|too many requests"
+)
+
+_NETWORK_ERRORS = {
+    "dns": ("ERR_NAME_NOT_RESOLVED", "ERR_NAME_RESOLUTION_FAILED", "getaddrinfo", "Name or service not known"),
+    "network": (
+        "ERR_CONNECTION", "ERR_INTERNET_DISCONNECTED", "ERR_NETWORK_CHANGED", "ERR_TIMED_OUT",
+        "ERR_EMPTY_RESPONSE", "ERR_SSL", "ERR_HTTP2"
+    ),
+    "browser_crash": ("Target closed", "has been closed", "Browser closed", "crashed", "Connection closed")
+}
+
+
+class ScrapeError(Exception):
+    """A scrape failure with a structured error code"""
+
+    def __init__(self, code: str, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.code = code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return ERROR_CODES.get(self.code, False)
+
+
+def status_error(status: int, url: str, retry_after: Optional[str] = None) -> Optional[ScrapeError]:
+    """ScrapeError for an unusable HTTP status of the profile document, else None"""
+    if status < 400:
+        return None
+    if status == 429:
+        code = "http_429"
+    elif status >= 500:
+        code = "http_5xx"
+    elif status in (404, 410):
+        code = "not_found"
+    elif status == 403:
+        code = "blocked"
+    else:
+        code = "http_4xx"
+    try:
+        delay = float(retry_after) if retry_after else None
+    except ValueError:
+        delay = None
+    return ScrapeError(code, f"HTTP {status} for {url}", retry_after=delay)
+
+
+def check_response(response, url: str):
+    """Raise for an error status on the ``page.goto`` response"""
+    if response is None:
+        return
+    error = status_error(response.status, url, response.headers.get("retry-after"))
+    if error:
+        raise error
+
+
+def check_blocked(text_content: str, url: str):
+    """Raise when the rendered text is a bot wall rather than a profile"""
+    if len(text_content) < BLOCKED_PAGE_MAX_CHARS and BLOCKED_PAGE_PATTERNS.search(text_content):
+        raise ScrapeError("blocked", f"Blocked or challenge page served for {url}")
+
+
+def classify_error(error: BaseException) -> ScrapeError:
+    """Map any exception raised while scraping to a ScrapeError"""
+    if isinstance(error, ScrapeError):
+        return error
+    message = str(error) or type(error).__name__
+    if isinstance(error, PlaywrightTimeoutError):
+        return ScrapeError("nav_timeout", message)
+    if isinstance(error, FutureTimeoutError):
+        return ScrapeError("pool_timeout", message)
+    for code, markers in _NETWORK_ERRORS.items():
+        if any(marker in message for marker in markers):
+            return ScrapeError(code, message)
+    if isinstance(error, PlaywrightError) and "Cannot navigate to invalid URL" in message:
+        return ScrapeError("invalid_url", message)
+    return ScrapeError("unknown", message)
+
+
+class RetryPolicy:
+    """Full-jitter exponential backoff: sleep uniform(0, min(cap, base * 2^n))"""
+
+    def __init__(self, max_attempts: int = MAX_ATTEMPTS, base_delay: float = BACKOFF_BASE_SECONDS,
+                 max_delay: float = BACKOFF_MAX_SECONDS):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, error: ScrapeError, attempt: int) -> bool:
+        return error.retryable and attempt < self.max_attempts
+
+    def delay(self, error: ScrapeError, attempt: int) -> float:
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if error.retry_after is not None:
+            return max(backoff, min(error.retry_after, self.max_delay))
+        return backoff
+
+
+class CircuitBreaker:
+    """
+    Closed: scrapes run and the failure rate over the last ``window`` is
+    tracked; reaching ``failure_rate`` opens the breaker. Open: callers
+    pause until the cooldown ends. Half-open: only ``trial_calls`` scrapes
+    run at a time while the rest keep waiting; that many successes close
+    the breaker again, a failure re-opens it with a doubled cooldown.
+    Callers ask ``wait_seconds`` until it returns 0, then report the
+    outcome with ``record``. Thread-safe.
+    """
+
+    def __init__(self, window: int = BREAKER_WINDOW, failure_rate: float = BREAKER_FAILURE_RATE,
+                 min_calls: int = BREAKER_MIN_CALLS, cooldown: float = BREAKER_COOLDOWN_SECONDS,
+                 trial_calls: int = BREAKER_TRIAL_CALLS):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.trial_calls = max(1, trial_calls)
+        self.state = "closed"
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._open_until = 0.0
+        self._trials_in_flight = 0
+        self._trial_successes = 0
+        self._lock = threading.Lock()
+
+    def wait_seconds(self) -> float:
+        """
+        0 when the caller may scrape now (while half-open this takes one of
+        the trial slots), else how long to wait before asking again
+        """
+        with self._lock:
+            if self.state == "open":
+                remaining = self._open_until - time.monotonic()
+                if remaining > 0:
+                    return remaining
+                self.state = "half_open"
+                self._trials_in_flight = self._trial_successes = 0
+            if self.state == "half_open":
+                if self._trials_in_flight >= self.trial_calls:
+                    return BREAKER_TRIAL_POLL_SECONDS
+                self._trials_in_flight += 1
+            return 0.0
+
+    def _trip(self):
+        self.state = "open"
+        self._open_until = time.monotonic() + self.cooldown
+        self.cooldown = min(self.cooldown * 2, BREAKER_MAX_COOLDOWN_SECONDS)
+        self.trips += 1
+        self._outcomes.clear()
+
+    def record(self, success: bool, error: Optional[ScrapeError] = None):
+        # Permanent per-profile errors say nothing about the site's health
+        neutral = error is not None and not error.retryable
+        with self._lock:
+            if self.state == "half_open":
+                self._trials_in_flight = max(0, self._trials_in_flight - 1)
+                if neutral:
+                    return
+                if not success:
+                    self._trip()
+                    return
+                self._trial_successes += 1
+                if self._trial_successes >= self.trial_calls:
+                    self.state = "closed"
+                    self.cooldown = self.base_cooldown
+                    self._outcomes.clear()
+                return
+
+            if neutral or self.state == "open":
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._trip()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "open": self.state == "open" and self._open_until > time.monotonic(),
+                "trips": self.trips,
+                "recent_calls": len(self._outcomes),
+                "recent_failures": self._outcomes.count(False)
+            }
+
+
+_breaker: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Process-wide circuit breaker shared by single scrapes and batches"""
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker()
+        return _breaker
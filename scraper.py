@@ -0,0 +1,280 @@
+"""
+Playwright scraping and text extraction for Salesforce Trailblazer profiles
+"""
+import os
+import time
+from typing import Dict, List, Optional
+
+from agentblazer import levels_decided, match_modules
+from api_capture import ApiCapture, get_api_client, get_endpoint_registry, has_profile_stats, parse_profile_json
+from browser_pool import get_browser_pool
+from extraction import KEYWORD_MATCHER, extract
+from metrics import StageTimings, get_metrics
+from page_extraction import ARCHIVE_HTML, archive_page, extract_page_until
+from profile_cache import ProfileCache, get_profile_cache
+from profile_urls import normalize_profile_url
+from readiness import wait_for_profile_ready
+from resource_blocking import BLOCK_RESOURCES, ResourceBlocker
+from retry_policy import RetryPolicy, check_blocked, check_response, classify_error, get_circuit_breaker
+
+# "browser" renders every profile (capturing its API calls on the way);
+# "http" first replays known API endpoints without a browser
+SCRAPER_MODE = os.environ.get("SCRAPER_MODE", "browser")
+
+# Headers to appear more like a real browser
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive'
+}
+
+def find_keywords(text_content: str) -> List[str]:
+    """Agentblazer keywords (across all levels) present in lowercased text"""
+    return list(KEYWORD_MATCHER.find_all(text_content))
+
+def levels_decided_for(extracted: Dict, api: Optional[Dict] = None) -> bool:
+    """
+    Stop condition for lazy badge loading: every level proven or ruled out.
+    Stats parsed from API JSON captured so far (``api``) take precedence as
+    in ``merge_api_data``, so wrong or missing DOM points cannot stop
+    loading early.
+    """
+    if api is None or not has_profile_stats(api):
+        return levels_decided(extracted["points"], extracted["keywords_found"])
+    points = extracted["points"] if api["points"] is None else api["points"]
+    return levels_decided(points, extracted["keywords_found"] + find_keywords(api["text"]))
+
+def extract_profile_data(text_content: str, url: str) -> Dict:
+    """
+    Extract points, badges, rank and Agentblazer keywords from lowercased page text
+    """
+    return build_profile_data(extract(text_content), url)
+
+def build_profile_data(extracted: Dict, url: str) -> Dict:
+    """Profile data from the fields returned by ``extract`` or ``extract_page``"""
+    profile_data = {
+        "points": extracted["points"],
+        "badges": extracted["badges"],
+        "modules": match_modules(extracted.get("badge_titles", [])),
+        "keywords_found": extracted["keywords_found"],
+        "rank": extracted["rank"],
+        "profile_url": url,
+        "success": True
+    }
+    if extracted.get("badge_titles"):
+        profile_data["badge_titles"] = extracted["badge_titles"]
+    if "badges_stop" in extracted:
+        profile_data["badge_pages"] = extracted["badge_pages"]
+        profile_data["badges_stop"] = extracted["badges_stop"]
+    
+    return profile_data
+
+def merge_api_data(profile_data: Dict, parsed: Dict) -> Dict:
+    """Prefer stats parsed from captured API JSON over regexes on rendered text"""
+    if not has_profile_stats(parsed):
+        return profile_data
+    
+    if parsed["points"] is not None:
+        profile_data["points"] = parsed["points"]
+    if parsed["badges"] is not None:
+        profile_data["badges"] = parsed["badges"]
+    if parsed["rank"]:
+        profile_data["rank"] = parsed["rank"]
+    
+    api_keywords = find_keywords(parsed["text"])
+    profile_data["keywords_found"] = list(dict.fromkeys(profile_data["keywords_found"] + api_keywords))
+    badge_titles = list(dict.fromkeys(profile_data.get("badge_titles", []) + parsed["badge_titles"]))
+    profile_data["modules"] = match_modules(badge_titles)
+    profile_data["badge_titles"] = badge_titles
+    profile_data["source"] = "api"
+    return profile_data
+
+def profile_data_from_api(parsed: Dict, url: str) -> Dict:
+    """Build profile data purely from API JSON (browserless mode)"""
+    profile_data = extract_profile_data("", url)
+    return merge_api_data(profile_data, parsed)
+
+def failed_profile_data(url: str, error: str, error_code: str = "unknown", attempts: int = 1) -> Dict:
+    """Profile result returned when a scrape could not be completed"""
+    return {
+        "success": False,
+        "error": error,
+        "error_code": error_code,
+        "attempts": attempts,
+        "points": 0,
+        "badges": 0,
+        "keywords_found": [],
+        "modules": [],
+        "profile_url": url
+    }
+
+def _scrape_profile_page(context, url: str, timings: StageTimings) -> Dict:
+    """
+    Scrape a single profile inside an isolated browser context from the pool
+    """
+    with timings.stage("new_page"):
+        # Skip images, fonts, styles and trackers; only the text is read
+        blocker = ResourceBlocker() if BLOCK_RESOURCES else None
+        if blocker:
+            blocker.install(context)
+        
+        # Create page with realistic settings
+        page = context.new_page()
+        
+        # Keep the profile's backend JSON responses as they arrive
+        capture = ApiCapture()
+        capture.attach(page)
+        
+        # Set headers to appear more like a real browser
+        page.set_extra_http_headers(BROWSER_HEADERS)
+    
+    # Navigate to profile; error statuses (429, 5xx, 404...) raise ScrapeError
+    with timings.stage("goto"):
+        response = page.goto(url, timeout=30000, wait_until='domcontentloaded')
+    check_response(response, url)
+    
+    # Wait until the profile stats have rendered (bounded)
+    with timings.stage("ready_wait"):
+        ready_via, ready_ms = wait_for_profile_ready(page)
+    
+    # One in-page evaluation returns only the fields we need; more badges
+    # are loaded only while some level is still undecided (judged with any
+    # API stats already captured, which override the DOM values)
+    with timings.stage("extract"):
+        early_payloads, _ = capture.collect()
+        api = parse_profile_json(early_payloads) if early_payloads else None
+        extracted = extract_page_until(page, lambda found: levels_decided_for(found, api))
+    check_blocked(extracted["short_text"], url)
+    
+    profile_data = build_profile_data(extracted, url)
+    profile_data["source"] = "dom"
+    
+    # Raw HTML only in debug/archive mode
+    if ARCHIVE_HTML:
+        with timings.stage("archive"):
+            profile_data["archive_path"] = archive_page(page, url)
+    
+    with timings.stage("api_merge"):
+        payloads, requests_made = capture.collect()
+        if payloads:
+            parsed = parse_profile_json(payloads)
+            if has_profile_stats(parsed):
+                merge_api_data(profile_data, parsed)
+                get_endpoint_registry().record(url, requests_made)
+    
+    profile_data["ready_via"] = ready_via
+    profile_data["ready_ms"] = round(ready_ms, 1)
+    if blocker:
+        profile_data["network"] = blocker.stats()
+    return profile_data
+
+def scrape_salesforce_profile(url: str) -> Dict:
+    """
+    Scrape Salesforce Trailblazer profile using a pooled Playwright browser,
+    retrying transient failures with backoff. Per-stage timings are returned
+    in ``timings_ms`` and recorded in the shared metrics.
+    """
+    metrics = get_metrics()
+    timings = StageTimings(metrics)
+    started = time.perf_counter()
+    
+    if SCRAPER_MODE == "http":
+        with timings.stage("http_fetch"):
+            profile_data = fetch_profile_http(url)
+        if profile_data:
+            metrics.inc("scraper_profiles_total", outcome="success", source="api")
+            profile_data["timings_ms"] = timings.ms
+            return profile_data
+    
+    policy = RetryPolicy()
+    breaker = get_circuit_breaker()
+    attempt = 0
+    while True:
+        attempt += 1
+        # Pause while the shared breaker is open (site throttling or down)
+        with timings.stage("breaker_wait"):
+            pause = breaker.wait_seconds()
+            while pause > 0:
+                time.sleep(pause)
+                pause = breaker.wait_seconds()
+        queued_at = time.perf_counter()
+        
+        def scrape_page(context):
+            # Time spent waiting for a free (possibly freshly launched) browser
+            timings.record("pool_wait", time.perf_counter() - queued_at)
+            return _scrape_profile_page(context, url, timings)
+        
+        try:
+            profile_data = get_browser_pool().run(scrape_page)
+        except Exception as e:
+            error = classify_error(e)
+            breaker.record(False, error)
+            metrics.inc("scraper_attempt_errors_total", error_code=error.code)
+            if not policy.should_retry(error, attempt):
+                timings.record("total", time.perf_counter() - started)
+                metrics.inc("scraper_profiles_total", outcome="error", source="dom")
+                profile_data = failed_profile_data(url, str(error), error.code, attempt)
+                profile_data["timings_ms"] = timings.ms
+                return profile_data
+            with timings.stage("backoff"):
+                time.sleep(policy.delay(error, attempt))
+            continue
+        breaker.record(True)
+        timings.record("total", time.perf_counter() - started)
+        metrics.inc("scraper_profiles_total", outcome="success", source=profile_data.get("source", "dom"))
+        profile_data["attempts"] = attempt
+        profile_data["timings_ms"] = timings.ms
+        return profile_data
+
+def fetch_profile_http(url: str, etags: Optional[List[Optional[str]]] = None) -> Optional[Dict]:
+    """
+    Browserless fetch through previously captured API endpoints; None when
+    the endpoints are unknown or returned no points (grading needs them,
+    so the browser path takes over)
+    """
+    parsed = get_api_client().fetch(url, headers={"User-Agent": BROWSER_HEADERS["User-Agent"]}, etags=etags)
+    if parsed is None or parsed.get("not_modified"):
+        return parsed
+    if parsed["points"] is None:
+        return None
+    profile_data = profile_data_from_api(parsed, url)
+    profile_data["etags"] = parsed["etags"]
+    return profile_data
+
+def scrape_with_cache(url: str, cache: Optional[ProfileCache] = None, refresh: bool = False) -> Dict:
+    """
+    Serve a profile from the persistent cache while it is fresh; otherwise
+    revalidate it by ETag (HTTP mode, keeping a changed API response) or
+    scrape it again, and store the result.
+    ``refresh`` forces a new scrape. Any profile URL form is scraped at its
+    canonical address.
+    """
+    cache = cache or get_profile_cache()
+    url = normalize_profile_url(url)
+    entry = None if refresh else cache.lookup(url)
+    
+    if entry and entry["fresh"]:
+        get_metrics().inc("scraper_cache_requests_total", result="hit")
+        return {**entry["data"], "cache": "hit"}
+    
+    # Stale but unchanged upstream: keep the cached copy
+    if entry and entry["etags"] and SCRAPER_MODE == "http":
+        revalidated = fetch_profile_http(url, etags=entry["etags"])
+        if revalidated and revalidated.get("not_modified"):
+            cache.touch(url)
+            get_metrics().inc("scraper_cache_requests_total", result="revalidated")
+            return {**entry["data"], "cache": "revalidated"}
+        if revalidated:
+            # Changed upstream: the full API response is the new copy
+            get_metrics().inc("scraper_cache_requests_total", result="miss")
+            etags = revalidated.pop("etags", None)
+            cache.put(url, revalidated, etags=etags)
+            return {**revalidated, "cache": "miss"}
+    
+    get_metrics().inc("scraper_cache_requests_total", result="miss")
+    profile_data = scrape_salesforce_profile(url)
+    etags = profile_data.pop("etags", None)
+    cache.put(url, profile_data, etags=etags)
+    return {**profile_data, "cache": "miss"}
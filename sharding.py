@@ -0,0 +1,121 @@
+"""
+Sharded batch execution across processes or containers.
+
+Roster rows are assigned to shards by rendezvous (highest random weight)
+hashing of their canonical profile key, so every row of a profile lands on
+the same shard, the split is stable across machines, and changing the shard
+count only moves about 1/N of the profiles. Each shard runs as its own
+``python -m cli batch --shard I/N`` process with its own browser and its
+own cache partition (``shard_cache_path``), writes
+``<output>.shardI-of-N.<ext>`` tagged with each row's roster position, and
+``merge_shard_outputs`` reassembles one output in roster order.
+
+    python -m cli sharded roster.csv --shards 4 --output data/results.csv
+"""
+import hashlib
+import os
+import subprocess
+import sys
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from batch_io import RESULT_COLUMNS, read_results
+from profile_cache import CACHE_PATH
+
+ROSTER_ROW_COLUMN = "Roster Row"
+SHARD_RESULT_COLUMNS = [ROSTER_ROW_COLUMN] + RESULT_COLUMNS
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'2/4' -> (2, 4); shards are numbered from 0"""
+    try:
+        shard, shards = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like I/N, got {spec!r}")
+    if shards < 1:
+        raise ValueError(f"Shard count must be at least 1, got {spec!r}")
+    if not 0 <= shard < shards:
+        raise ValueError(f"Shard index must be in 0..{shards - 1}, got {spec!r}")
+    return shard, shards
+
+
+def _weight(key: str, shard: int) -> int:
+    digest = hashlib.blake2b(f"{shard}:{key}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def shard_for(key: str, shards: int) -> int:
+    """Shard owning a canonical profile key (stable across processes and hosts)"""
+    if shards <= 1:
+        return 0
+    return max(range(shards), key=lambda shard: _weight(key, shard))
+
+
+def _with_suffix(path: str, suffix: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{suffix}{ext}"
+
+
+def shard_output_path(output: str, shard: int, shards: int) -> str:
+    return _with_suffix(output, f"shard{shard}-of-{shards}")
+
+
+def shard_cache_path(shard: int, base: str = CACHE_PATH) -> str:
+    """
+    Per-shard cache partition, so shards never contend for one SQLite file.
+    Keyed by index only: after a shard-count change, profiles that stay on
+    their index keep their cached results.
+    """
+    return _with_suffix(base, f"shard{shard}")
+
+
+def merge_shard_outputs(output: str, shards: int) -> int:
+    """
+    Merge every shard's results into ``output`` in roster order; returns
+    the number of rows. Missing shard files are skipped (partial merge).
+    """
+    frames = [
+        read_results(path)
+        for path in (shard_output_path(output, shard, shards) for shard in range(shards))
+        if os.path.exists(path)
+    ]
+    merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=SHARD_RESULT_COLUMNS)
+    merged[ROSTER_ROW_COLUMN] = pd.to_numeric(merged[ROSTER_ROW_COLUMN])
+    merged = merged.sort_values(ROSTER_ROW_COLUMN, kind="stable").reindex(columns=RESULT_COLUMNS)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    tmp_path = output + ".tmp"
+    if output.endswith(".parquet"):
+        merged.to_parquet(tmp_path, index=False)
+    else:
+        merged.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, output)
+    return len(merged)
+
+
+def run_local_shards(shards: int, batch_args: List[str], output: str, quiet: bool = False) -> List[int]:
+    """
+    Start one ``cli batch`` process per shard and wait for all of them;
+    returns their exit codes. ``batch_args`` are passed to every shard.
+    """
+    processes = []
+    for shard in range(shards):
+        command = [
+            sys.executable, "-m", "cli", "batch", *batch_args,
+            "--shard", f"{shard}/{shards}",
+            "--output", shard_output_path(output, shard, shards)
+        ]
+        if quiet:
+            command.append("--quiet")
+        processes.append(subprocess.Popen(command))
+
+    codes: List[Optional[int]] = []
+    try:
+        for process in processes:
+            codes.append(process.wait())
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+        raise
+    return codes